@@ -0,0 +1,87 @@
+# ai_council/audit.py
+import os, gzip, json, queue, logging, threading
+from .blobs import BlobStore
+
+logger = logging.getLogger("ai_council")
+
+LOG_DIR = "logs"
+MAX_PART_BYTES = 8 * 1024 * 1024  # Compressed size at which a new part file is started.
+
+class AuditWriter:
+    """
+    Writes audit records from a background thread so logging never stalls a turn.
+    Records go to logs/<session_id>/audit-NNNN.jsonl.gz, one JSON object per line,
+    rotating to a new part once the compressed file passes max_bytes.
+    """
+
+    def __init__(self, session_id: str, log_dir: str = LOG_DIR, max_bytes: int = MAX_PART_BYTES, blobs: BlobStore | None = None):
+        self.directory = os.path.join(log_dir, session_id)
+        self.max_bytes = max_bytes
+        self.blobs = blobs
+        os.makedirs(self.directory, exist_ok=True)
+        # Resumed sessions start a fresh part rather than appending to a possibly torn one.
+        self.part = len([name for name in os.listdir(self.directory) if name.startswith("audit-")])
+        self._file = self._raw = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict):
+        """Queues a record; returns immediately."""
+        self._queue.put(record)
+
+    def flush(self):
+        """Blocks until every queued record is on disk."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _open_part(self):
+        self.part += 1
+        path = os.path.join(self.directory, f"audit-{self.part:04d}.jsonl.gz")
+        self._raw = open(path, 'ab')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='ab')
+
+    def _close_part(self):
+        if self._file:
+            self._file.close()
+            self._raw.close()
+            self._file = self._raw = None
+            if self.blobs: self.blobs.sync()  # One batch of blob fsyncs per finished part.
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._close_part()
+                    return
+                if isinstance(item, threading.Event):
+                    if self._file:
+                        self._file.flush()
+                        self._raw.flush()
+                    item.set()
+                    continue
+                if self._file is None: self._open_part()
+                record = self.blobs.pack(item) if self.blobs else item
+                self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+                if self._raw.tell() >= self.max_bytes: self._close_part()
+            except Exception as e:  # A logging failure must never take down the session.
+                logger.warning("Could not write audit record: %s", e, exc_info=True)
+                if isinstance(item, threading.Event): item.set()
+
+def iter_records(session_id: str, log_dir: str = LOG_DIR, blobs: BlobStore | None = None):
+    """Streams a session's audit records back in write order, across all parts."""
+    directory = os.path.join(log_dir, session_id)
+    for name in sorted(n for n in os.listdir(directory) if n.startswith("audit-")):
+        with gzip.open(os.path.join(directory, name), 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    yield blobs.unpack(record) if blobs else record
+            except (EOFError, json.JSONDecodeError):
+                continue  # Part cut short by a crash (or still open); keep what was readable.
@@ -0,0 +1,89 @@
+# ai_council/batch.py
+from __future__ import annotations
+import os, re, json, time, asyncio
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:  # The SDK is heavy to import; it is loaded when the client is built.
+    from openai import AsyncOpenAI
+from . import council, report, session, utils
+from .cache import ResponseCache
+from .health import ModelHealth
+from .scheduler import Scheduler
+from .telemetry import Telemetry
+
+def load_jobs(path: str, templates: dict) -> list:
+    """
+    Reads batch jobs from JSONL. Each line is either {"id": ..., "prompt": ...} or
+    {"id": ..., "template": "category.name", "fill": {...}}; "id" defaults to the line number.
+    """
+    jobs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip(): continue
+            job = json.loads(line)
+            if 'template' in job:
+                category, _, name = job['template'].partition('.')
+                prompt = templates[category][name].format(**job.get('fill', {}))
+            elif 'prompt' in job:
+                prompt = job['prompt']
+            else:
+                raise ValueError(f"{path}:{line_number}: a job needs either 'prompt' or 'template'")
+            jobs.append({"id": str(job.get('id', line_number)), "prompt": prompt})
+    return jobs
+
+async def _run_job(client: AsyncOpenAI, job: dict, batch_id: str, models: dict, rapporteur_model: str, prompts: dict,
+                   settings: dict, cache: ResponseCache | None, scheduler: Scheduler, telemetry: Telemetry, health: ModelHealth | None, out_dir: str) -> dict:
+    state = session.new_session_state()
+    state.update({
+        "session_id": f"{batch_id}/{job['id']}", "selected_models": models, "rapporteur_model_id": rapporteur_model,
+        "last_user_input": job['prompt'],
+    })
+    started = time.monotonic()
+    try:
+        state = await council.run_turn(client, state, prompts, job['prompt'], settings, cache, scheduler, headless=True, telemetry=telemetry, health=health)
+        # Advisors that missed the quorum still cost money; include them before reporting the job's cost.
+        await council.wait_for_stragglers(state['session_id'])
+    except Exception as e:
+        utils.logger.warning("Batch job %s failed: %s", job['id'], e, exc_info=True)
+        return {"id": job['id'], "error": str(e), "seconds": time.monotonic() - started}
+    report_path = os.path.join(out_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', job['id']) + ".md")
+    report.write_report(report_path, [{"turn": 1, "user_prompt": job['prompt'], "rapporteur_report": state['last_rapporteur_report']}],
+                        state['session_id'], state['total_session_cost'], status="complete")
+    return {"id": job['id'], "report": report_path, "cost": state['total_session_cost'], "seconds": time.monotonic() - started}
+
+async def run_batch(client: AsyncOpenAI, jobs: list, models: dict, rapporteur_model: str, prompts: dict, settings: dict,
+                    scheduler: Scheduler, cache: ResponseCache | None = None, health: ModelHealth | None = None,
+                    out_root: str = os.path.join("output", "batch")) -> str:
+    """
+    Runs the jobs through the council and Rapporteur concurrently, headless, at most
+    [batch] max_jobs at a time (the scheduler caps the requests they make). Writes one
+    report per job plus results.jsonl (appended as jobs finish) and returns the output directory.
+    """
+    batch_id = session.new_session_id()
+    out_dir = os.path.join(out_root, batch_id)
+    os.makedirs(out_dir, exist_ok=True)
+    utils.open_audit_log(f"batch_{batch_id}")
+    telemetry = Telemetry(f"batch_{batch_id}")
+    utils.logger.info("Batch %s: %d jobs, %d advisors each", batch_id, len(jobs), len(models))
+
+    # Jobs beyond max_jobs wait here rather than in the scheduler's queue, so their turns are not started (and timed) early.
+    job_slots = asyncio.Semaphore(settings.get('batch', {}).get('max_jobs', 8))
+    async def run_job(job: dict) -> dict:
+        async with job_slots:
+            return await _run_job(client, job, batch_id, models, rapporteur_model, prompts, settings, cache, scheduler, telemetry, health, out_dir)
+
+    tasks = [asyncio.create_task(run_job(job)) for job in jobs]
+    total_cost, failures = 0.0, 0
+    with open(os.path.join(out_dir, "results.jsonl"), 'w', encoding='utf-8') as results:
+        for finished, task in enumerate(asyncio.as_completed(tasks), 1):
+            outcome = await task
+            results.write(json.dumps(outcome) + "\n"); results.flush()
+            total_cost += outcome.get('cost', 0)
+            failures += 'error' in outcome
+            utils.logger.info("[%d/%d] %s %s in %.1fs", finished, len(jobs), outcome['id'], "failed" if 'error' in outcome else "done", outcome['seconds'])
+
+    await council.drain_stragglers()
+    await telemetry.close()
+    if health: health.save()
+    utils.close_audit_log()
+    utils.logger.info("Batch %s finished: %d ok, %d failed, total cost $%.6f -> %s", batch_id, len(jobs) - failures, failures, total_cost, out_dir)
+    return out_dir
@@ -0,0 +1,105 @@
+# ai_council/blobs.py
+import os, re, glob, gzip, time, zlib, hashlib, argparse, threading
+
+BLOB_DIR = os.path.join("logs", "blobs")
+MIN_BLOB_CHARS = 1024  # Shorter strings stay inline; they are cheaper to repeat than to reference.
+BLOB_REF = re.compile(r"sha256:([0-9a-f]{64})")
+# Where blob references live: the interactive journal, service session journals and audit logs.
+REFERENCE_GLOBS = ("session_journal.jsonl", os.path.join("sessions", "*", "journal.jsonl"), os.path.join("logs", "*", "audit-*.jsonl.gz"))
+
+class BlobStore:
+    """
+    Content-addressed store for large strings (prompts, documents, responses).
+    Each distinct string is written once, zlib-compressed, under its SHA-256; JSON
+    structures hold {"$blob": "sha256:..."} references in its place. Reads are
+    interned so identical content loaded from many places shares one object in memory.
+    Writes are not fsynced one by one: a caller that needs them durable (the session
+    journal, before appending a record that references them) calls sync(). Blobs no
+    journal or audit log references any more are removed by sweep().
+    """
+
+    def __init__(self, root: str = BLOB_DIR, min_chars: int = MIN_BLOB_CHARS):
+        self.root = root
+        self.min_chars = min_chars
+        self._interned = {}  # ref -> str, so every load of the same blob shares one object
+        self._unsynced, self._lock = [], threading.Lock()  # put() runs on the audit thread too.
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        path = self._path(digest)
+        try:
+            os.utime(path)  # Already stored: refresh its age so a concurrent sweep() leaves it alone.
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f: f.write(zlib.compress(text.encode('utf-8')))
+            os.replace(tmp_path, path)
+            with self._lock: self._unsynced.append(path)
+        return f"sha256:{digest}"
+
+    def sync(self):
+        """Makes every blob written since the last sync durable."""
+        with self._lock: paths, self._unsynced = self._unsynced, []
+        for path in paths:
+            try: fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError: continue  # Swept in the meantime.
+            try: os.fsync(fd)
+            finally: os.close(fd)
+
+    def sweep(self, reference_files: list, min_age_s: float = 24 * 3600) -> int:
+        """
+        Deletes blobs that none of `reference_files` (JSONL, optionally gzipped) mentions and that are
+        older than `min_age_s`. put() refreshes the age of every blob it hands out, so blobs of a record still
+        being written are never removed. Returns the count.
+        """
+        referenced = set()
+        for path in reference_files:
+            try:
+                with (gzip.open(path, 'rt', encoding='utf-8') if path.endswith(".gz") else open(path, 'r', encoding='utf-8')) as f:
+                    for line in f: referenced.update(BLOB_REF.findall(line))
+            except (OSError, EOFError):
+                continue  # Vanished or cut short by a crash; what was read still counts.
+        removed, cutoff = 0, time.time() - min_age_s
+        for path in glob.glob(os.path.join(self.root, "??", "*")):
+            digest = os.path.basename(os.path.dirname(path)) + os.path.basename(path)
+            if digest not in referenced and not path.endswith(".tmp") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                self._interned.pop(f"sha256:{digest}", None)
+                removed += 1
+        return removed
+
+    def get(self, ref: str) -> str:
+        if (text := self._interned.get(ref)) is None:
+            with open(self._path(ref.split(":", 1)[1]), 'rb') as f:
+                text = self._interned[ref] = zlib.decompress(f.read()).decode('utf-8')
+        return text
+
+    def pack(self, value):
+        """Returns a copy of a JSON-able structure with large strings replaced by blob references."""
+        if isinstance(value, str): return {"$blob": self.put(value)} if len(value) >= self.min_chars else value
+        if isinstance(value, dict): return {k: self.pack(v) for k, v in value.items()}
+        if isinstance(value, list): return [self.pack(v) for v in value]
+        return value
+
+    def unpack(self, value):
+        """Inverse of pack(): resolves blob references back into (shared) strings."""
+        if isinstance(value, dict):
+            if len(value) == 1 and "$blob" in value: return self.get(value["$blob"])
+            return {k: self.unpack(v) for k, v in value.items()}
+        if isinstance(value, list): return [self.unpack(v) for v in value]
+        return value
+
+store = BlobStore()
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove blobs that no session journal or audit log references.")
+    parser.add_argument("--min-age-hours", type=float, default=24, help="Keep blobs younger than this, referenced or not.")
+    args = parser.parse_args()
+    references = [path for pattern in REFERENCE_GLOBS for path in glob.glob(pattern)]
+    print(f"Removed {store.sweep(references, args.min_age_hours * 3600)} unreferenced blob(s) from {store.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# ai_council/cache.py
+import os, json, time, sqlite3, hashlib
+
+class ResponseCache:
+    """
+    Opt-in on-disk cache of model responses, keyed on a stable hash of model id and
+    messages (requests use the provider's default sampling params). Entries are evicted least-recently-used once the
+    cache exceeds its size or entry budget, and outright once they pass max_age_days.
+    """
+
+    def __init__(self, path: str = ".cache/responses.sqlite", max_mb: float = 200, max_entries: int = 5000, max_age_days: float = 30):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_entries = max_entries
+        self.max_age_s = max_age_days * 86400
+        self.hits = self.misses = 0
+        self.saved_cost = 0.0
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, cost REAL, size INTEGER, created REAL, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.commit()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResponseCache":
+        """Builds a cache from the [cache] section of models.toml."""
+        return cls(**{k: v for k, v in config.items() if k in ("path", "max_mb", "max_entries", "max_age_days")})
+
+    @staticmethod
+    def make_key(model: str, messages: list) -> str:
+        payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        row = self.db.execute("SELECT response, cost, created FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[2] > self.max_age_s:
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self.db.commit()
+        self.hits += 1
+        self.saved_cost += row[1]
+        return {"response": row[0], "cost": row[1]}
+
+    def put(self, key: str, model: str, response: str, cost: float):
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model, response, cost, len(response.encode("utf-8")), now, now),
+        )
+        self.evict(now)
+        self.db.commit()
+
+    def evict(self, now: float | None = None):
+        """Drops expired entries, then the least recently used ones until within budget."""
+        now = now or time.time()
+        self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age_s,))
+        count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            key, size = self.db.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 1").fetchone()
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count, total = count - 1, total - size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "saved_cost": self.saved_cost}
+
+    def close(self):
+        self.db.close()
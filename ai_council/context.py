@@ -0,0 +1,88 @@
+# ai_council/context.py
+import re
+from .scheduler import provider_of
+
+DOC_BLOCK = re.compile(r"--- DOCUMENT CONTEXT ---\n.*?\n--- END DOCUMENT CONTEXT ---\n\n", re.DOTALL)
+DOC_REFERENCE = "[Document context unchanged; see the document provided earlier in this conversation.]\n\n"
+SUMMARY_HEADER = "Summary of earlier turns in this conversation:\n"
+SUMMARY_END = "--- END OF SUMMARY ---\n\n"  # Separates the summary from the first user message it is merged into.
+
+def estimate_tokens(messages: list) -> int:
+    """Cheap token estimate (~4 characters per token plus per-message overhead); no tokenizer needed."""
+    return sum(len(m['content']) // 4 + 4 for m in messages)
+
+def budget_for(model_id: str, config: dict) -> int | None:
+    """Looks up a model's context budget in the [context] section of models.toml."""
+    return config.get('budgets', {}).get(model_id, config.get('default_budget'))
+
+def _excerpt(text: str, limit: int, tail: bool = False) -> str:
+    text = " ".join(DOC_BLOCK.sub("", text).replace(DOC_REFERENCE, "").split())
+    if len(text) <= limit: return text
+    return "…" + text[-limit:].lstrip() if tail else text[:limit].rstrip() + "…"
+
+def fit_history(history: list, prompt: str, budget: int | None, fold_target: float = 1.0) -> tuple[list, str, int]:
+    """
+    Fits one advisor's history plus the new prompt under `budget` tokens.
+    Document blocks already present in the history are not resent, and once over budget
+    the oldest turns are folded into a rolling summary until the total fits in `fold_target`
+    of the budget. The summary is prefixed to the first remaining user message (the prompt
+    itself once every turn is folded), so user and assistant turns still alternate. Folding
+    below the budget leaves room for a few turns before the next fold, so the history prefix
+    (and any provider prompt cache) stays stable.
+    Returns the new history, the prompt to send, and the number of tokens saved.
+    """
+    before = estimate_tokens(history + [{"role": "user", "content": prompt}])
+    seen_docs = {block for m in history for block in DOC_BLOCK.findall(m['content'])}
+    prompt = DOC_BLOCK.sub(lambda m: DOC_REFERENCE if m.group(0) in seen_docs else m.group(0), prompt)
+
+    history = list(history)
+    summary_lines, pinned_docs = [], []
+    if history and history[0]['content'].startswith(SUMMARY_HEADER):
+        body, _, rest = history[0]['content'][len(SUMMARY_HEADER):].partition(SUMMARY_END)
+        history[0] = {**history[0], "content": rest}
+        pinned_docs = DOC_BLOCK.findall(body)
+        summary_lines = [line for line in DOC_BLOCK.sub("", body).split("\n") if line]
+
+    new_message = {"role": "user", "content": prompt}
+    def assemble() -> list:
+        messages = history + [new_message]
+        if not summary_lines and not pinned_docs: return messages
+        # Documents dropped along with their turn stay pinned so later DOC_REFERENCEs still resolve.
+        summary = SUMMARY_HEADER + "\n".join(summary_lines) + "\n\n" + "".join(pinned_docs) + SUMMARY_END
+        return [{**messages[0], "content": summary + messages[0]['content']}] + messages[1:]
+
+    if budget and estimate_tokens(assemble()) > budget:
+        budget = int(budget * fold_target)
+    while budget and history and estimate_tokens(assemble()) > budget:
+        dropped = history[:2]
+        del history[:2]
+        for message in dropped:
+            pinned_docs.extend(block for block in DOC_BLOCK.findall(message['content']) if block not in pinned_docs)
+        question = next((m['content'] for m in dropped if m['role'] == 'user'), "")
+        answer = next((m['content'] for m in dropped if m['role'] == 'assistant'), "")
+        # Follow-up prompts end with the user's feedback, so keep the tail of the question.
+        summary_lines.append(f"- User asked: {_excerpt(question, 200, tail=True)}")
+        summary_lines.append(f"  You answered: {_excerpt(answer, 400)}")
+    # The summary itself is bounded too: once every turn is folded in, shed its oldest lines.
+    while budget and len(summary_lines) > 2 and estimate_tokens(assemble()) > budget:
+        del summary_lines[:2]
+
+    messages = assemble()
+    return messages[:-1], messages[-1]['content'], before - estimate_tokens(messages)
+
+def add_cache_markers(messages: list, model_id: str, config: dict) -> list:
+    """
+    Marks the stable prefix of a request (the system prompt and everything before the new
+    message) with cache_control breakpoints, for providers that only cache on request
+    (the [prompt_cache] section of models.toml). Other providers cache prefixes automatically.
+    Returns a copy; stored histories keep plain string content.
+    """
+    if provider_of(model_id) not in config.get('marker_providers', []): return messages
+    min_tokens = config.get('min_tokens', 1024)
+    marked = list(messages)
+    breakpoints = {i for i, m in enumerate(messages[:-1]) if m['role'] == 'system'}
+    if len(messages) > 1: breakpoints.add(len(messages) - 2)
+    for i in sorted(breakpoints):
+        if estimate_tokens(messages[:i + 1]) < min_tokens: continue
+        marked[i] = {**messages[i], "content": [{"type": "text", "text": messages[i]['content'], "cache_control": {"type": "ephemeral"}}]}
+    return marked
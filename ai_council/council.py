@@ -1,72 +1,385 @@
 # ai_council/council.py
+from __future__ import annotations
+import math
 import asyncio
 import json
-from openai import AsyncOpenAI
-# NEW: Import the Status spinner from rich
-from rich.status import Status
-from . import ui, utils
+import time
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:  # The SDK is heavy to import; it is loaded when the client is built.
+    from openai import AsyncOpenAI
+from . import context, report, session, ui, utils
+from .cache import ResponseCache
+from .health import ModelHealth
+from .scheduler import Scheduler
+from .telemetry import Telemetry
 
-async def ask_advisor(client: AsyncOpenAI, model_name: str, friendly_name: str, messages: list):
-    # This function is correct and remains unchanged.
+def usage_summary(usage) -> dict:
+    """Token counts from an OpenAI-style usage object, including provider-side cached prompt tokens."""
+    if usage is None: return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0, "completion_tokens": usage.completion_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+    }
+
+async def _request_completion(client: AsyncOpenAI, model_name: str, friendly_name: str, messages: list, progress: dict, stream: bool) -> dict:
     try:
-        response = await client.chat.completions.with_raw_response.create(model=model_name, messages=messages)
-        chat_completion = response.parse()
-        return {"advisor": friendly_name, "response": chat_completion.choices[0].message.content, "cost": float(response.headers.get("x-openrouter-cost", 0))}
+        if not stream:
+            response = await client.chat.completions.with_raw_response.create(model=model_name, messages=messages)
+            chat_completion = response.parse()
+            return {"advisor": friendly_name, "response": chat_completion.choices[0].message.content, "cost": float(response.headers.get("x-openrouter-cost", 0)),
+                    "usage": usage_summary(chat_completion.usage)}
+
+        response = await client.chat.completions.with_raw_response.create(
+            model=model_name, messages=messages, stream=True,
+            stream_options={"include_usage": True}, extra_body={"usage": {"include": True}},
+        )
+        cost = float(response.headers.get("x-openrouter-cost", 0))
+        # Exposed on `progress` so the UI can render the text while it streams.
+        parts, usage = [], None
+        progress["parts"] = parts
+        async for chunk in response.parse():
+            if chunk.choices and (delta := chunk.choices[0].delta.content):
+                if progress["first_token"] is None: progress["first_token"] = time.monotonic()
+                progress["tokens"] += 1  # One content chunk is roughly one token until usage arrives.
+                parts.append(delta)
+            if chunk.usage: usage = chunk.usage
+        if usage is not None:
+            progress["tokens"] = usage.completion_tokens or progress["tokens"]
+            # OpenRouter reports the billed cost on the final usage chunk when usage accounting is requested.
+            if (usage_cost := getattr(usage, "cost", None)) is not None: cost = float(usage_cost)
+        return {"advisor": friendly_name, "response": "".join(parts), "cost": cost, "usage": usage_summary(usage)}
     except Exception as e:
         return {"advisor": friendly_name, "response": e, "cost": 0, "error": True}
 
-async def run_turn(client: AsyncOpenAI, state: dict, prompts: dict, council_prompt: str) -> dict:
+async def ask_advisor(client: AsyncOpenAI, model_name: str, friendly_name: str, messages: list, progress: dict | None = None, stream: bool = True,
+                      cache: ResponseCache | None = None, scheduler: Scheduler | None = None):
+    """
+    Queries one model. When streaming, `progress` is updated with TTFT and token counts as chunks arrive.
+    With a scheduler, the request goes through its limits and retry policy; time spent waiting for a
+    slot (or backing off) before the final attempt is reported as `queue_time`.
+    """
+    if progress is None: progress = {}
+    queued = time.monotonic()
+    # Without a scheduler the request starts right away; with one, slot_at is set when it gets a slot.
+    progress.update({"start": queued, "first_token": None, "end": None, "tokens": 0, "slot_at": None if scheduler else queued})
+    key = cache.make_key(model_name, messages) if cache else None
+    if key and (hit := cache.get(key)) is not None:
+        progress["slot_at"] = queued
+        # Cache hits are free; the original cost is tracked by the cache as savings.
+        result = {"advisor": friendly_name, "response": hit["response"], "cost": 0, "cached": True}
+    else:
+        attempt = lambda attempt_progress: _request_completion(client, model_name, friendly_name, messages, attempt_progress, stream)
+        # The scheduler owns concurrency limits, rate limiting, retries and hedging.
+        result = await scheduler.submit(model_name, attempt, progress) if scheduler else await attempt(progress)
+        if key and not result.get("error"): cache.put(key, model_name, result["response"], result["cost"])
+    progress["end"] = time.monotonic()
+    result["latency"] = progress["end"] - progress["start"]
+    if progress["first_token"] is not None: result["ttft"] = progress["first_token"] - (progress.get("hedge_start") or progress["start"])
+    result["queue_time"] = progress["start"] - queued
+    return result
+
+# Straggler collectors outlive the turn that spawned them; keep references so they are not garbage collected.
+_late_tasks: set = set()
+
+def _record_advisor_result(state: dict, model_id: str, prompt: str, result: dict, fitted: list | None = None, base_len: int = 0):
+    """Appends the exchange to the advisor's history, swapping in the budget-fitted prefix when given."""
+    histories = state['council_histories']
+    current = histories.get(model_id, [])
+    exchange = [{"role": "user", "content": prompt}, {"role": "assistant", "content": result['response']}]
+    # Anything appended since dispatch (e.g. a late answer from an earlier turn) is kept after the fitted prefix.
+    histories[model_id] = (fitted + current[base_len:] if fitted is not None else current) + exchange
+    state['total_session_cost'] += result.get('cost', 0)
+
+def _audit_result(result: dict) -> dict:
+    return {k: (str(v) if isinstance(v, Exception) else v) for k, v in result.items()}
+
+async def _collect_stragglers(pending: list, state: dict, prompts_sent: dict, turn: int, telemetry: Telemetry | None = None,
+                             health: ModelHealth | None = None):
+    """
+    Waits for advisors that missed the quorum and folds their answers into telemetry, model health
+    and the audit log. A late answer joins the advisor's history only while that history is still as
+    it was at dispatch; once a later exchange is recorded, it would land out of order and is left out.
+    If the collector is cancelled, the advisors it was waiting for are cancelled too.
+    """
+    late_results = []
+    try:
+        for task in asyncio.as_completed(pending):
+            result = await task
+            history_key, model_id, fitted, prompt, base_len = prompts_sent[result['advisor']]
+            if telemetry: telemetry.record("advisor", model_id, result, turn, state.get('session_id'))
+            if health: health.record(model_id, result)
+            if not result.get('error'):
+                if len(state['council_histories'].get(history_key, [])) == base_len:
+                    _record_advisor_result(state, history_key, prompt, result, fitted, base_len)
+                else:
+                    state['total_session_cost'] += result.get('cost', 0)
+                    utils.logger.info("Late answer from %s for turn %d arrived after a later exchange; kept out of its history", result['advisor'], turn)
+            late_results.append(_audit_result(result))
+    finally:
+        unfinished = [task.get_name() for task in pending if not task.done()]
+        for task in pending: task.cancel()
+        utils.write_audit_log(turn, {"session_id": state.get('session_id'), "late_council_responses": late_results,
+                                     "cancelled_advisors": unfinished}, kind="late")
+
+async def wait_for_stragglers(session_id: str | None):
+    """Waits for one session's late advisors, e.g. so a batch job's cost includes them."""
+    if collectors := [task for task in _late_tasks if task.get_name() == f"stragglers:{session_id}"]:
+        await asyncio.wait(collectors)
+
+async def drain_stragglers(timeout_s: float = 10.0):
+    """
+    Gives advisors still answering an earlier turn up to `timeout_s` to finish, e.g. when the session
+    ends, then cancels the rest. Their results (or cancellation) reach the audit log either way.
+    """
+    if _late_tasks: await asyncio.wait(list(_late_tasks), timeout=timeout_s)
+    for task in list(_late_tasks): task.cancel()
+    await asyncio.gather(*_late_tasks, return_exceptions=True)
+
+def follow_up_prompt(previous_report: str, feedback: str, doc_context: str = "") -> str:
+    """The council prompt for a follow-up turn: retrieved document context, last synthesis, then the user's feedback."""
+    return doc_context + f"Previous summary:\n{previous_report}\n\nMy new feedback: \"{feedback}\"\nRefine your answer."
+
+def _advisor_event(result: dict) -> dict:
+    error = result.get('response') if result.get('error') else None
+    return {"advisor": result['advisor'], "error": str(error) if error is not None else None,
+            "latency": result.get('latency'), "cached": bool(result.get('cached'))}
+
+async def _relay_stream(task: asyncio.Task, progress: dict, on_event) -> dict:
+    """Headless counterpart of ui.stream_rapporteur_report: passes streamed text to `on_event` as it arrives."""
+    parts, seen = None, 0
+    while True:
+        done = task.done()
+        if progress.get("parts") is not parts:
+            if seen: on_event("rapporteur_restart", {})  # A retry or a winning hedge starts a new stream.
+            parts, seen = progress.get("parts"), 0
+        if parts is not None and len(parts) > seen:
+            on_event("rapporteur_delta", {"text": "".join(parts[seen:])})
+            seen = len(parts)
+        if done: return task.result()
+        await asyncio.wait([task], timeout=0.1)
+
+async def _throttled(limit: asyncio.Semaphore, request):
+    async with limit:
+        return await request
+
+# Used when the prompts file predates group summaries.
+DEFAULT_GROUP_SUMMARY_PROMPT = (
+    "You are assisting the Council Facilitator with a large council. You will receive a JSON object mapping advisors "
+    "(or groups of advisors) to their responses. Condense them into one concise Markdown summary that keeps every distinct "
+    "position, recommendation and disagreement, and says which advisors hold each one. Do not add opinions of your own."
+)
+
+REDUCE_HEADER = "Condense the following council responses, keeping every distinct position and who holds it."
+
+def _payload_tokens(responses: dict) -> int:
+    return len(json.dumps(responses)) // 4
+
+async def _reduce_responses(client: AsyncOpenAI, model: str, responses: dict, system_prompt: str, max_tokens: int, group_size: int,
+                            state: dict, cache: ResponseCache | None = None, scheduler: Scheduler | None = None,
+                            telemetry: Telemetry | None = None) -> tuple[dict, list]:
+    """
+    Shrinks the council's responses until the Rapporteur payload fits in `max_tokens`: each group of
+    `group_size` responses is summarized into one entry, level by level. A group whose summary fails
+    is kept as truncated excerpts. Returns the reduced responses and audit entries for the summaries.
+    """
+    group_size, level, audit_entries = max(2, group_size), 0, []
+    members = {name: [name] for name in responses}
+    while len(responses) > 1 and _payload_tokens(responses) > max_tokens:
+        level += 1
+        items = list(responses.items())
+        groups = [items[i:i + group_size] for i in range(0, len(items), group_size)]
+        requests = []
+        for i, group in enumerate(groups, 1):
+            content = REDUCE_HEADER + "\n\n" + json.dumps(dict(group), indent=2)
+            messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": content}]
+            requests.append((content, ask_advisor(client, model, f"Group {level}.{i}", messages, stream=False, cache=cache, scheduler=scheduler)))
+        results = await asyncio.gather(*(request for _, request in requests))
+        reduced, grouped = {}, {}
+        for group, (content, _), result in zip(groups, requests, results):
+            if telemetry: telemetry.record("reduction", model, result, state['turn_counter'], state.get('session_id'))
+            state['total_session_cost'] += result.get('cost', 0)
+            audit_entries.append({"request": content, **_audit_result(result)})
+            names = [member for name, _ in group for member in members[name]]
+            if result.get('error'):
+                utils.logger.warning("Could not summarize %s: %s", result['advisor'], result['response'])
+                text = "\n\n".join(f"{name}: {response[:max_tokens * 4 // len(items)]}" for name, response in group)
+            else:
+                text = result['response']
+            reduced[result['advisor']] = f"Advisors: {', '.join(names)}\n\n{text}"
+            grouped[result['advisor']] = names
+        if _payload_tokens(reduced) >= _payload_tokens(responses): break  # Summaries no shorter than their input; stop.
+        responses, members = reduced, grouped
+    return responses, audit_entries
+
+SMALL_QUORUM_FRACTION = 0.1  # A fixed quorum under this share of the seats draws a warning.
+_quorum_warnings: set = set()
+
+def quorum_for(dispatch: dict, seats: int) -> int | None:
+    """
+    The number of answers a turn waits for (None for all of them). A quorum below 1 is a
+    fraction of the seats; a fixed quorum is used as configured, with a warning (once per
+    council size) when it is a small share of a large council.
+    """
+    quorum = dispatch.get('quorum')
+    if not quorum: return None
+    if quorum < 1: return max(1, math.ceil(quorum * seats))
+    if quorum < SMALL_QUORUM_FRACTION * seats and (quorum, seats) not in _quorum_warnings:
+        _quorum_warnings.add((quorum, seats))
+        utils.logger.warning("quorum = %d lets %d of %d advisors end each turn; consider a fraction such as quorum = 0.8",
+                             quorum, quorum, seats)
+    return int(quorum)
+
+async def run_turn(client: AsyncOpenAI, state: dict, prompts: dict, council_prompt: str, settings: dict | None = None,
+                   cache: ResponseCache | None = None, scheduler: Scheduler | None = None, headless: bool = False,
+                   telemetry: Telemetry | None = None, health: ModelHealth | None = None, on_event=None) -> dict:
+    """
+    Runs one council turn. `settings` is the parsed models.toml, read for its [dispatch], [context]
+    and [fallbacks] policies. With `health`, a seat whose model is currently slow or failing is
+    handed to its first healthy fallback, or skipped.
+    A headless turn skips the live dashboard and the streamed report rendering (used by batch mode
+    and the service); `on_event(kind, data)` then receives advisor results and the streamed report.
+    """
     histories = state['council_histories']
     models = state['selected_models']
     rapporteur_model = state['rapporteur_model_id']
+    settings = settings or {}
+    dispatch, context_config = settings.get('dispatch', {}), settings.get('context', {})
+    prompt_cache_config = settings.get('prompt_cache', {})
+
+    # 0. Swap out (or skip) seats whose model is unhealthy. A seat keeps its history, keyed by
+    # its configured model, whichever model answers for it.
+    seated, seat_changes = dict(models), {}
+    if health:
+        fallbacks = settings.get('fallbacks', {})
+        for name, model_id in models.items():
+            chosen, reason = health.choose(model_id, fallbacks.get(name, []))
+            if chosen != model_id:
+                seated[name] = chosen
+                seat_changes[name] = {"from": model_id, "to": chosen, "reason": reason}
+        if not any(seated.values()):
+            # Never skip every seat; an unhealthy council still beats none.
+            seated = {name: chosen or models[name] for name, chosen in seated.items()}
+            seat_changes = {name: change for name, change in seat_changes.items() if change['to']}
+        for name, change in seat_changes.items():
+            utils.logger.warning("Seat %s: %s is unhealthy (%s), %s", name, change['from'], change['reason'],
+                                 f"using {change['to']}" if change['to'] else "skipping this turn")
+        if seat_changes and on_event: on_event("seat_changes", seat_changes)
 
     # 1. Dispatch to Council with Live Progress
-    tasks = []
-    for name, model_id in models.items():
-        messages_for_model = histories.get(model_id, []) + [{"role": "user", "content": council_prompt}]
-        task = asyncio.create_task(ask_advisor(client, model_id, name, messages_for_model))
+    tasks, progress, prompts_sent, tokens_saved = [], {}, {}, {}
+    # Large councils are started at most `fan_out` at a time, however many seats there are.
+    fan_out = asyncio.Semaphore(dispatch['fan_out']) if dispatch.get('fan_out') else None
+    for name, history_key in models.items():
+        if (model_id := seated[name]) is None: continue
+        history = histories.get(history_key, [])
+        fitted, prompt, tokens_saved[name] = context.fit_history(history, council_prompt, context.budget_for(model_id, context_config), context_config.get('fold_target', 1.0))
+        prompts_sent[name] = (history_key, model_id, fitted, prompt, len(history))
+        # The history is an unchanged prefix of last turn's request, so it can be served from the provider's prompt cache.
+        messages_for_model = context.add_cache_markers(fitted + [{"role": "user", "content": prompt}], model_id, prompt_cache_config)
+        progress[name] = {"fallback_for": history_key, "model": model_id} if model_id != history_key else {}
+        request = ask_advisor(client, model_id, name, messages_for_model, progress[name], cache=cache, scheduler=scheduler)
+        task = asyncio.create_task(_throttled(fan_out, request) if fan_out else request)
         task.set_name(name)
         tasks.append(task)
-    council_results = await ui.live_council_progress(tasks)
+    # Each advisor's deadline runs from when it got its request slot, not from when the turn began.
+    started_at = lambda task: progress[task.get_name()].get("slot_at")
+    quorum = quorum_for(dispatch, len(tasks))
+    if headless:
+        on_result = (lambda result: on_event("advisor", _advisor_event(result))) if on_event else None
+        council_results = await utils.wait_for_quorum(tasks, quorum, dispatch.get('deadline_s'), on_result, started_at)
+    else:
+        skipped = {name: change['reason'] for name, change in seat_changes.items() if change['to'] is None}
+        council_results = await ui.live_council_progress(tasks, progress, quorum, dispatch.get('deadline_s'), skipped,
+                                                         dispatch.get('aggregate_above'), dispatch.get('top_n', 10), started_at)
+
+    # 1b. Deal with advisors that missed the quorum/deadline
+    pending = [task for task in tasks if not task.done()]
+    if pending:
+        if dispatch.get('stragglers', 'late') == 'cancel':
+            for task in pending:
+                task.cancel()
+                # The time it had run so far is a lower bound on its latency; still worth counting (unless fan_out never let it start).
+                if health and (started := progress[task.get_name()].get('start')) is not None:
+                    health.record(seated[task.get_name()], {"latency": time.monotonic() - started})
+        else:
+            collector = asyncio.create_task(_collect_stragglers(pending, state, prompts_sent, state['turn_counter'], telemetry, health))
+            collector.set_name(f"stragglers:{state.get('session_id')}")
+            _late_tasks.add(collector)
+            collector.add_done_callback(_late_tasks.discard)
 
     # 2. Write audit log
     audit_data = {
-        "turn": state['turn_counter'], "prompt_sent_to_council": council_prompt,
-        "raw_council_responses": [{k: (str(v) if isinstance(v, Exception) else v) for k, v in res.items()} for res in council_results]
+        "session_id": state.get('session_id'), "user_input": state['last_user_input'], "prompt_sent_to_council": council_prompt,
+        "seats": models, "rapporteur_model": rapporteur_model,
+        "raw_council_responses": [_audit_result(res) for res in council_results],
+        "late_advisors": [task.get_name() for task in pending],
+        "context_tokens_saved": tokens_saved,
+        "seat_changes": seat_changes,
     }
     utils.write_audit_log(state['turn_counter'], audit_data)
 
     # 3. Process successful results
     current_responses = {}
     for result in council_results:
+        history_key, model_id, fitted, prompt, base_len = prompts_sent[result['advisor']]
+        if telemetry: telemetry.record("advisor", model_id, result, state['turn_counter'], state.get('session_id'))
+        if health: health.record(model_id, result)
         if not result.get('error'):
-            name, model_id, response_text = result['advisor'], models[result['advisor']], result['response']
-            if model_id not in histories: histories[model_id] = []
-            histories[model_id].extend([{"role": "user", "content": council_prompt}, {"role": "assistant", "content": response_text}])
-            current_responses[name] = response_text
-            state['total_session_cost'] += result.get('cost', 0)
+            _record_advisor_result(state, history_key, prompt, result, fitted, base_len)
+            current_responses[result['advisor']] = result['response']
+
+    state['last_turn_tokens_saved'] = sum(tokens_saved.values())
+    # Time actually spent waiting on models; run_turn's wall time minus these is orchestration overhead.
+    state['last_turn_timings'] = {"slowest_advisor_s": max((r.get('latency', 0) for r in council_results), default=0), "rapporteur_s": 0}
 
     # 4. Call the Rapporteur for synthesis
     if not current_responses:
-        print("\n[!] No successful responses from the council. Skipping Rapporteur.")
+        utils.logger.warning("No successful responses from the council. Skipping Rapporteur.")
         state['last_rapporteur_report'] = "> [!ERROR]\n> No successful responses were received from the council for this turn."
     else:
+        # A large council's answers can outgrow the Rapporteur's context; summarize them in groups first.
+        rapporteur_config, reductions = settings.get('rapporteur', {}), []
+        if (max_payload := rapporteur_config.get('max_payload_tokens')) and _payload_tokens(current_responses) > max_payload:
+            current_responses, reductions = await _reduce_responses(
+                client, rapporteur_config.get('reducer_model', rapporteur_model), current_responses, prompts.get('group_summary_prompt', DEFAULT_GROUP_SUMMARY_PROMPT),
+                max_payload, rapporteur_config.get('group_size', 8), state, cache, scheduler, telemetry)
         payload_json = json.dumps({"user_feedback": state['last_user_input'], "council_responses": current_responses}, indent=2)
         rapporteur_user_prompt = (
             "Please analyze the following data from the AI Council session and generate your synthesis report...\n"
             "```json\n" f"{payload_json}\n" "```"
         )
+        # The system prompt is identical every turn; keep it first so it is a cacheable prefix.
         messages = [{"role": "system", "content": prompts['rapporteur_system_prompt']}, {"role": "user", "content": rapporteur_user_prompt}]
+        messages = context.add_cache_markers(messages, rapporteur_model, prompt_cache_config)
         
-        # --- NEW: ADDED STATUS SPINNER ---
-        with Status("[bold green]Rapporteur is compiling the report...", spinner="earth", console=ui.console):
-            rapporteur_result = await ask_advisor(client, rapporteur_model, "Rapporteur", messages)
-        # --- END NEW ---
+        if headless and on_event:
+            rapporteur_progress = {}
+            rapporteur_task = asyncio.create_task(ask_advisor(client, rapporteur_model, "Rapporteur", messages, rapporteur_progress, cache=cache, scheduler=scheduler))
+            rapporteur_result = await _relay_stream(rapporteur_task, rapporteur_progress, on_event)
+        elif headless:
+            rapporteur_result = await ask_advisor(client, rapporteur_model, "Rapporteur", messages, cache=cache, scheduler=scheduler)
+        else:
+            # Stream the synthesis to the terminal and the session report as it is generated.
+            rapporteur_progress = {}
+            rapporteur_task = asyncio.create_task(ask_advisor(client, rapporteur_model, "Rapporteur", messages, rapporteur_progress, cache=cache, scheduler=scheduler))
+            with report.open_draft(session.report_path(state), state) as report_file:
+                rapporteur_result = await ui.stream_rapporteur_report(rapporteur_task, rapporteur_progress, report_file)
+                if rapporteur_result.get('error'):
+                    report_file.write(f"> [!ERROR]\n> Rapporteur failed to generate a report: {rapporteur_result['response']}\n")
+        if telemetry: telemetry.record("rapporteur", rapporteur_model, rapporteur_result, state['turn_counter'], state.get('session_id'))
+        utils.write_audit_log(state['turn_counter'], {"session_id": state.get('session_id'), "rapporteur_response": _audit_result(rapporteur_result),
+                                                    "reductions": reductions}, kind="rapporteur")
 
-        state['last_rapporteur_report'] = rapporteur_result.get('response', 'Rapporteur failed to generate a report.')
+        if rapporteur_result.get('error'):
+            state['last_rapporteur_report'] = f"> [!ERROR]\n> Rapporteur failed to generate a report: {rapporteur_result['response']}"
+            if not headless: ui.display_rapporteur_report(state['last_rapporteur_report'], banner=False)
+        else:
+            state['last_rapporteur_report'] = rapporteur_result['response']
         state['total_session_cost'] += rapporteur_result.get('cost', 0)
-    
-    # 5. Display the final report for the turn
-    ui.display_rapporteur_report(state['last_rapporteur_report'])
-    
+        state['last_turn_timings']['rapporteur_s'] = rapporteur_result.get('latency', 0)
+
+    # 5. Without a synthesis there was nothing to stream, so display the error report for the turn
+    if not headless and not current_responses: ui.display_rapporteur_report(state['last_rapporteur_report'])
+
     return state
\ No newline at end of file
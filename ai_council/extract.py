@@ -0,0 +1,121 @@
+# ai_council/extract.py
+import os, re, json, atexit, asyncio, hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_DIR = os.path.join(".cache", "extract")
+PAGES_PER_BATCH = 16
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+TEXT_PAGE_CHARS = 64 * 1024  # Plain-text files are streamed in pseudo-pages of this size.
+RANGE_SUFFIX = re.compile(r"^(.*\S):\s*([\d,\-\s]+)$")
+
+_executor = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        atexit.register(shutdown)
+    return _executor
+
+def shutdown():
+    """Stops the extraction worker processes, if any were started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+def split_path_and_pages(raw: str) -> tuple[str, str | None]:
+    """Splits 'report.pdf:1-20,25' into the path and the page spec (None when no spec is given)."""
+    raw = raw.strip().strip('"').strip("'")
+    if (match := RANGE_SUFFIX.match(raw)) and not os.path.exists(raw):
+        return match.group(1).strip().strip('"').strip("'"), match.group(2).replace(" ", "")
+    return raw, None
+
+def parse_page_spec(spec: str | None, page_count: int) -> list:
+    """Turns a 1-based spec such as '1-5,8' into sorted 0-based page numbers."""
+    if not spec: return list(range(page_count))
+    pages = set()
+    for part in spec.split(","):
+        if not part: continue
+        start, _, end = part.partition("-")
+        first, last = int(start), int(end or start)
+        if first < 1 or last < first: raise ValueError(f"Invalid page range '{part}'")
+        pages.update(range(first - 1, min(last, page_count)))
+    return sorted(pages)
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""): digest.update(block)
+    return digest.hexdigest()
+
+def _pdf_page_count(path: str) -> int:
+    import fitz
+    with fitz.open(path) as doc: return doc.page_count
+
+def _extract_pdf_pages(path: str, pages: list) -> list:
+    """Worker: extracts one batch of pages. Runs in a separate process."""
+    import fitz
+    with fitz.open(path) as doc: return [doc[page].get_text() for page in pages]
+
+def _count_lines(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as f: return sum(1 for _ in f)
+
+def _write_text_pages(path: str, out) -> int:
+    count = 0
+    for text in _iter_text_pages(path):
+        out.write(json.dumps(text, ensure_ascii=False) + "\n"); count += 1
+    return count
+
+def _iter_text_pages(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        page, size = [], 0
+        for line in f:
+            page.append(line); size += len(line)
+            if size >= TEXT_PAGE_CHARS:
+                yield "".join(page)
+                page, size = [], 0
+        if page: yield "".join(page)
+
+async def _iter_pdf_pages(path: str, pages: list):
+    """Yields page text in order while keeping at most one batch per worker in flight."""
+    loop, executor = asyncio.get_running_loop(), _get_executor()
+    batches = [pages[i:i + PAGES_PER_BATCH] for i in range(0, len(pages), PAGES_PER_BATCH)]
+    window = MAX_WORKERS
+    in_flight = [loop.run_in_executor(executor, _extract_pdf_pages, path, batch) for batch in batches[:window]]
+    for next_batch in batches[window:] + [None] * len(in_flight):
+        texts = await in_flight.pop(0)
+        if next_batch is not None: in_flight.append(loop.run_in_executor(executor, _extract_pdf_pages, path, next_batch))
+        for text in texts: yield text
+
+async def extract_document(path: str, page_spec: str | None = None) -> tuple[str, int, bool]:
+    """
+    Extracts a txt/md/pdf file into a per-page JSONL cache keyed by the file's content hash
+    (and page spec). Returns (cache path, page count, served from cache).
+    """
+    is_pdf = path.lower().endswith('.pdf')
+    if not is_pdf and not path.lower().endswith(('.txt', '.md')):
+        raise ValueError("Unsupported file type.")
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(None, file_hash, path)
+    suffix = f"_{hashlib.sha256(page_spec.encode()).hexdigest()[:12]}" if page_spec and is_pdf else ""
+    cache_path = os.path.join(CACHE_DIR, f"{digest}{suffix}.jsonl")
+    if os.path.exists(cache_path): return cache_path, await asyncio.to_thread(_count_lines, cache_path), True
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path, count = f"{cache_path}.{os.getpid()}.tmp", 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if is_pdf:
+            page_count = await loop.run_in_executor(_get_executor(), _pdf_page_count, path)
+            async for text in _iter_pdf_pages(path, parse_page_spec(page_spec, page_count)):
+                f.write(json.dumps(text, ensure_ascii=False) + "\n"); count += 1
+        else:
+            # Plain text needs no worker process, but is still read off the event loop.
+            count = await asyncio.to_thread(_write_text_pages, path, f)
+    os.replace(tmp_path, cache_path)
+    return cache_path, count, False
+
+def iter_pages(cache_path: str):
+    """Streams page text back out of an extraction cache file."""
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        for line in f: yield json.loads(line)
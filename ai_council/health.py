@@ -0,0 +1,87 @@
+# ai_council/health.py
+import os, json, time
+from collections import deque
+
+HEALTH_FILE = os.path.join(".cache", "model_health.json")
+
+class ModelHealth:
+    """
+    Per-model latency and error statistics, persisted across sessions: an EWMA of
+    latency and of the error rate, plus a window of recent latencies for the p95.
+    Used to swap a council seat to a fallback model (or skip it) while its model is
+    slow or failing. A model left unused for `retry_after_s` is trusted again, so
+    a recovered model gets back into the council.
+    """
+
+    def __init__(self, path: str = HEALTH_FILE, alpha: float = 0.2, window: int = 50, min_samples: int = 5,
+                 max_p95_s: float | None = 60.0, max_error_rate: float | None = 0.5, retry_after_s: float = 3600,
+                 skip_unhealthy: bool = False):
+        self.path, self.alpha, self.window, self.min_samples = path, alpha, window, min_samples
+        self.max_p95_s, self.max_error_rate, self.retry_after_s = max_p95_s, max_error_rate, retry_after_s
+        self.skip_unhealthy = skip_unhealthy
+        self.models = self._load()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ModelHealth":
+        """Builds the tracker from the [health] section of models.toml."""
+        return cls(**{k: v for k, v in config.items() if k != "enabled"})
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: models = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        for stats in models.values(): stats["latencies"] = deque(stats["latencies"], maxlen=self.window)
+        return models
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {model: {**stats, "latencies": list(stats["latencies"])} for model, stats in self.models.items()}
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f: json.dump(data, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def record(self, model: str, result: dict):
+        """Folds one ask_advisor result into the model's statistics; cache hits say nothing about the model."""
+        if result.get("cached"): return
+        stats = self.models.get(model)
+        if stats is None or time.time() - stats["updated"] > self.retry_after_s:
+            # Statistics that old describe a model that may since have recovered; start afresh.
+            stats = self.models[model] = {"samples": 0, "ewma_latency_s": None, "error_rate": 0.0,
+                                          "latencies": deque(maxlen=self.window), "updated": 0.0}
+        failed = bool(result.get("error"))
+        stats["samples"] += 1
+        stats["error_rate"] += self.alpha * (failed - stats["error_rate"])
+        stats["updated"] = time.time()
+        if failed or "latency" not in result: return
+        latency = result["latency"]
+        stats["latencies"].append(latency)
+        previous = stats["ewma_latency_s"]
+        stats["ewma_latency_s"] = latency if previous is None else previous + self.alpha * (latency - previous)
+
+    def p95(self, model: str) -> float | None:
+        samples = self.models.get(model, {}).get("latencies")
+        if not samples: return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def problem(self, model: str) -> str | None:
+        """Why `model` should not be used right now, or None if it looks healthy (or is unknown or due a retry)."""
+        stats = self.models.get(model)
+        if not stats or stats["samples"] < self.min_samples: return None
+        if time.time() - stats["updated"] > self.retry_after_s: return None
+        if self.max_error_rate is not None and stats["error_rate"] > self.max_error_rate:
+            return f"error rate {stats['error_rate']:.0%}"
+        if self.max_p95_s is not None and (p95 := self.p95(model)) is not None and p95 > self.max_p95_s:
+            return f"p95 {p95:.1f}s"
+        return None
+
+    def choose(self, model: str, fallbacks: list) -> tuple[str | None, str | None]:
+        """
+        Picks the model to seat: `model` itself if healthy, else its first healthy fallback,
+        else None to skip the seat (or `model` anyway when skip_unhealthy is off).
+        Returns (model, reason the primary was passed over).
+        """
+        if (reason := self.problem(model)) is None: return model, None
+        for fallback in fallbacks:
+            if self.problem(fallback) is None: return fallback, reason
+        return (None, reason) if self.skip_unhealthy else (model, None)
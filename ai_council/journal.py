@@ -0,0 +1,98 @@
+# ai_council/journal.py
+import os, json
+from .blobs import BlobStore
+
+COMPACT_EVERY = 25  # Delta records between full snapshots.
+
+def _shadow(value):
+    """Shallow structural copy used to diff the next save against: dicts are walked, lists copied by reference."""
+    if isinstance(value, dict): return {k: _shadow(v) for k, v in value.items()}
+    if isinstance(value, list): return list(value)
+    return value
+
+def _diff(old, new, path: list, ops: list):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() - new.keys(): ops.append({"op": "del", "path": path + [key]})
+        for key, value in new.items():
+            if key not in old: ops.append({"op": "set", "path": path + [key], "value": value})
+            else: _diff(old[key], value, path + [key], ops)
+    elif isinstance(old, list) and isinstance(new, list):
+        # Histories and logs only grow, so an untouched prefix means we just append the tail.
+        if len(new) >= len(old) and all(a is b for a, b in zip(old, new)):
+            if len(new) > len(old): ops.append({"op": "extend", "path": path, "items": new[len(old):]})
+        else: ops.append({"op": "set", "path": path, "value": new})
+    elif old != new or type(old) is not type(new):
+        ops.append({"op": "set", "path": path, "value": new})
+
+def _apply(state: dict, op: dict):
+    *parents, last = op['path']
+    target = state
+    for key in parents: target = target[key]
+    if op['op'] == 'set': target[last] = op['value']
+    elif op['op'] == 'extend': target[last].extend(op['items'])
+    elif op['op'] == 'del': target.pop(last, None)
+
+class SessionJournal:
+    """
+    Append-only JSONL journal of session state. The first record is a full snapshot;
+    each save appends only the delta since the previous one and fsyncs it. A torn
+    final line from a crash is ignored on load. Every COMPACT_EVERY records the
+    journal is rewritten as a single snapshot via an atomic rename. With a BlobStore,
+    large strings are written to it once and records hold references instead.
+    """
+
+    def __init__(self, path: str, blobs: BlobStore | None = None):
+        self.path = path
+        self.blobs = blobs
+        self.shadow = None
+        self.records = 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> dict:
+        state, self.records = None, 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try: record = json.loads(line)
+                except json.JSONDecodeError: break  # Torn write from a crash; everything before it is intact.
+                if self.blobs: record = self.blobs.unpack(record)
+                if 'snapshot' in record: state = record['snapshot']
+                elif state is not None:
+                    for op in record['ops']: _apply(state, op)
+                self.records += 1
+        if state is None: raise ValueError(f"No snapshot found in {self.path}")
+        self.compact(state)
+        return state
+
+    def _write_durably(self, f, record: dict):
+        if self.blobs:
+            record = self.blobs.pack(record)
+            self.blobs.sync()  # Blobs this record references must be on disk before the record is.
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    def compact(self, state: dict):
+        """Rewrites the journal as one snapshot record, atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            self._write_durably(f, {"snapshot": state})
+        os.replace(tmp_path, self.path)
+        self.shadow, self.records = _shadow(state), 1
+
+    def save(self, state: dict):
+        if self.shadow is None or self.records >= COMPACT_EVERY:
+            self.compact(state)
+            return
+        ops = []
+        _diff(self.shadow, state, [], ops)
+        if not ops: return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            self._write_durably(f, {"ops": ops})
+        self.shadow = _shadow(state)
+        self.records += 1
+
+    def remove(self):
+        if self.exists(): os.remove(self.path)
+        self.shadow, self.records = None, 0
@@ -0,0 +1,165 @@
+# ai_council/replay.py
+"""
+Re-runs a recorded session through council.run_turn, answering each LLM request with
+the response the audit log recorded for it instead of calling OpenRouter. Seats named
+in `live_seats` (and the Rapporteur, with `live_rapporteur`) call their model for real,
+so a single seat or a new Rapporteur prompt can be tried without paying for the rest
+of the council. With timing="recorded", replayed answers stream back with their
+recorded time to first token and latency, which makes replays usable as performance
+regression runs.
+"""
+from __future__ import annotations
+import os, re, json, time, asyncio
+from collections import deque
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+from . import audit, blobs, council, report, session, utils
+from .scheduler import Scheduler
+
+class ReplayMissing(Exception):
+    """The recording has no answer for a request; reported as that advisor's error."""
+
+class ReplayedError(Exception):
+    """A request that failed when the session was recorded, failing the same way again."""
+
+def load_recording(log_name: str, session_id: str | None = None, log_dir: str = audit.LOG_DIR) -> dict:
+    """
+    Collects a session's turns from logs/<log_name>/: the prompts sent, the seats, and every
+    recorded council and Rapporteur response. A log holding several sessions (batch mode)
+    needs `session_id` to pick one.
+    """
+    sessions = {}
+    for record in audit.iter_records(log_name, log_dir, blobs.store):
+        turns = sessions.setdefault(record.get("session_id"), {})
+        # A resumed session can repeat a turn that was cut short; the later record wins.
+        if record["kind"] == "turn":
+            turns[record["turn"]] = {**record, "responses": list(record["raw_council_responses"]), "rapporteur": None}
+        elif record["turn"] in turns and record["kind"] == "late":
+            turns[record["turn"]]["responses"] += record["late_council_responses"]
+        elif record["turn"] in turns and record["kind"] == "rapporteur":
+            turns[record["turn"]]["rapporteur"] = record["rapporteur_response"]
+            turns[record["turn"]]["reductions"] = record.get("reductions", [])
+    if session_id is None:
+        if len(sessions) != 1: raise ValueError(f"{log_name} holds {len(sessions)} sessions; pick one of: {', '.join(map(str, sessions))}")
+        session_id = next(iter(sessions))
+    if session_id not in sessions: raise ValueError(f"No session {session_id} in {log_name}")
+    turns = [sessions[session_id][turn] for turn in sorted(sessions[session_id])]
+    if not turns or "seats" not in turns[0]:
+        raise ValueError(f"{log_name} was recorded without seats or Rapporteur responses and cannot be replayed")
+    return {"session_id": session_id, "seats": turns[0]["seats"], "rapporteur_model": turns[0]["rapporteur_model"], "turns": turns}
+
+def _usage(recorded: dict):
+    usage = recorded.get("usage") or {}
+    return SimpleNamespace(prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0),
+                           prompt_tokens_details=SimpleNamespace(cached_tokens=usage.get("cached_tokens", 0)), cost=recorded.get("cost", 0))
+
+def _chunk(content: str | None = None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+class ReplayClient:
+    """
+    Stands in for AsyncOpenAI's `chat.completions.with_raw_response.create`. Call `load_turn`
+    before each turn; requests for live models are passed to `live_client`.
+    """
+
+    def __init__(self, seats: dict, rapporteur_model: str, live_client: AsyncOpenAI | None = None, live_seats=(),
+                 live_rapporteur: bool = False, timing: str = "recorded", speed: float = 1.0):
+        self.live_client, self.timing, self.speed = live_client, timing, speed
+        self.live_models = {seats[name] for name in live_seats}
+        self.live_rapporteur = live_rapporteur
+        self.seats, self.rapporteur_model = seats, rapporteur_model
+        self._council, self._rapporteur, self._reductions = {}, None, {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self._create)))
+
+    def load_turn(self, turn: dict):
+        # Keyed by the seat's configured model: replays run without seat fallbacks, so that is the model requested.
+        self._council = {}
+        for recorded in turn["responses"]:
+            if (model := self.seats.get(recorded["advisor"])) is not None: self._council.setdefault(model, deque()).append(recorded)
+        self._rapporteur = turn["rapporteur"]
+        # Group summaries of a large council are matched on their exact input.
+        self._reductions = {entry["request"]: entry for entry in turn.get("reductions", [])}
+
+    async def _wait(self, seconds: float | None):
+        if self.timing == "recorded" and seconds: await asyncio.sleep(seconds / self.speed)
+
+    async def _create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        # Only the Rapporteur's requests (its synthesis and any group summaries) carry a system prompt;
+        # council requests are history plus the turn prompt.
+        is_rapporteur = messages[0]["role"] == "system"
+        if (self.live_rapporteur if is_rapporteur else model in self.live_models):
+            return await self.live_client.chat.completions.with_raw_response.create(model=model, messages=messages, stream=stream, **kwargs)
+        if not is_rapporteur:
+            recorded = (self._council.get(model) or deque([None])).popleft()
+        elif messages[-1]["content"].startswith(council.REDUCE_HEADER):
+            recorded = self._reductions.get(messages[-1]["content"])
+        else:
+            recorded = self._rapporteur
+        if recorded is None: raise ReplayMissing(f"No recorded {'Rapporteur ' if is_rapporteur else ''}response from {model}")
+        if recorded.get("error"):
+            await self._wait(recorded.get("latency"))
+            raise ReplayedError(recorded["response"])
+        if not stream:
+            await self._wait(recorded.get("latency"))
+            completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=recorded["response"]))], usage=_usage(recorded))
+            return SimpleNamespace(headers={"x-openrouter-cost": str(recorded.get("cost", 0))}, parse=lambda: completion)
+        return SimpleNamespace(headers={"x-openrouter-cost": str(recorded.get("cost", 0))}, parse=lambda: self._stream(recorded))
+
+    async def _stream(self, recorded: dict):
+        pieces = re.findall(r"\S+\s*|\s+", recorded["response"]) or [""]
+        ttft = recorded.get("ttft") or 0
+        await self._wait(ttft)
+        gap = max(0.0, (recorded.get("latency") or 0) - ttft) / len(pieces)
+        for piece in pieces:
+            yield _chunk(piece)
+            await self._wait(gap)
+        yield _chunk(usage=_usage(recorded))
+
+def _recorded_report(turn: dict) -> str:
+    recorded = turn["rapporteur"]
+    return recorded["response"] if recorded and not recorded.get("error") else ""
+
+async def replay_session(recording: dict, prompts: dict, settings: dict, live_client: AsyncOpenAI | None = None, live_seats=(),
+                         live_rapporteur: bool = False, timing: str = "recorded", speed: float = 1.0,
+                         scheduler: Scheduler | None = None, out_root: str = os.path.join("output", "replay")) -> str:
+    """
+    Replays `recording` (from load_recording) headlessly. Writes the replayed report and a
+    results.jsonl of per-turn timings, costs and whether the synthesis matches the recording;
+    returns the output directory.
+    """
+    replay_id = f"replay_{session.new_session_id()}"
+    out_dir = os.path.join(out_root, replay_id)
+    os.makedirs(out_dir, exist_ok=True)
+    utils.open_audit_log(replay_id)  # A replay is itself recorded, so it can be replayed or diffed.
+    client = ReplayClient(recording["seats"], recording["rapporteur_model"], live_client, live_seats, live_rapporteur, timing, speed)
+    state = session.new_session_state()
+    state.update({"session_id": replay_id, "selected_models": dict(recording["seats"]), "rapporteur_model_id": recording["rapporteur_model"]})
+    utils.logger.info("Replaying %s (%d turns) as %s; live: %s", recording["session_id"], len(recording["turns"]), replay_id,
+                      ", ".join([*live_seats, *(["Rapporteur"] if live_rapporteur else [])]) or "none")
+
+    previous_recorded, results_path = "", os.path.join(out_dir, "results.jsonl")
+    with open(results_path, 'w', encoding='utf-8') as results:
+        for turn in recording["turns"]:
+            client.load_turn(turn)
+            state['turn_counter'] = turn["turn"]
+            state['last_user_input'] = turn.get("user_input", turn["prompt_sent_to_council"])
+            # A follow-up prompt quotes the last synthesis; quote the replayed one, in case it differs.
+            council_prompt = turn["prompt_sent_to_council"]
+            if previous_recorded and state['last_rapporteur_report']:
+                council_prompt = council_prompt.replace(previous_recorded, state['last_rapporteur_report'], 1)
+            cost_before, started = state['total_session_cost'], time.monotonic()
+            state = await council.run_turn(client, state, prompts, council_prompt, settings, scheduler=scheduler, headless=True)
+            outcome = {"turn": turn["turn"], "seconds": time.monotonic() - started, **state['last_turn_timings'],
+                       "cost": state['total_session_cost'] - cost_before, "matches_recording": state['last_rapporteur_report'] == _recorded_report(turn)}
+            results.write(json.dumps(outcome) + "\n"); results.flush()
+            utils.logger.info("Turn %d replayed in %.2fs (%s)", turn["turn"], outcome["seconds"], "same synthesis" if outcome["matches_recording"] else "synthesis differs")
+            state['session_log'].append({"turn": turn["turn"], "user_prompt": state['last_user_input'], "rapporteur_report": state['last_rapporteur_report']})
+            previous_recorded = _recorded_report(turn)
+
+    await council.drain_stragglers()
+    utils.close_audit_log()
+    report.write_report(os.path.join(out_dir, "report.md"), state['session_log'], replay_id, state['total_session_cost'], status="complete")
+    return out_dir
@@ -0,0 +1,178 @@
+# ai_council/report.py
+"""
+The Obsidian-friendly Markdown session report, written turn by turn.
+
+The report opens with a fixed-width front-matter block (session id, turn count, cost,
+status and the byte length of the committed turns) that is rewritten in place, so
+committing a turn only appends that turn. Anything past `committed_bytes` (e.g. a
+synthesis that was still streaming when the process died) is discarded on the next
+write. JSON and HTML exports read the report back one turn at a time.
+
+    python -m ai_council.report output/<report>.md --format json,html
+"""
+import os, json, html, argparse, datetime
+
+TITLE = "# 🏛️ AI Council Session Report\n\nThis document contains the complete transcript of the AI Council session.\n\n"
+FRONT_MATTER_FIELDS = ("session_id", "turns", "total_cost", "status", "updated", "committed_bytes")
+FIELD_WIDTH = 64  # Every value is padded to this width so the block never changes size.
+TURN_HEADING = "## 🔄 Turn "
+SYNTHESIS_HEADING = "### 🧠 Rapporteur's Synthesis"
+
+def _front_matter(values: dict) -> bytes:
+    lines = [f"{field}: {str(values.get(field, '')).ljust(FIELD_WIDTH)}" for field in FRONT_MATTER_FIELDS]
+    return ("---\n" + "\n".join(lines) + "\n---\n\n").encode("utf-8")
+
+def read_front_matter(path: str) -> dict | None:
+    """The report's front-matter values (stripped strings), or None if the file is missing or has none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.readline() != "---\n": return None
+            values = {}
+            for line in f:
+                if line == "---\n": return values
+                key, _, value = line.partition(":")
+                values[key] = value.strip()
+    except FileNotFoundError:
+        pass
+    return None
+
+def format_turn_heading(turn: int, user_prompt: str) -> str:
+    quoted = user_prompt.replace("\n", "\n> ")
+    return f"***\n\n{TURN_HEADING}{turn}\n\n> [!QUESTION] User Input for Turn {turn}\n> {quoted}\n\n{SYNTHESIS_HEADING}\n\n"
+
+def format_turn(entry: dict) -> str:
+    return format_turn_heading(entry['turn'], entry.get('user_prompt', '')) + f"{entry.get('rapporteur_report', 'No report generated.')}\n\n"
+
+def write_report(path: str, session_log: list, session_id: str = "", total_cost: float = 0.0, status: str = "in progress"):
+    """Writes a complete report for `session_log` in one go (batch jobs, and rebuilding a missing or stale report)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    values = {"session_id": session_id, "turns": len(session_log), "total_cost": f"{total_cost:.6f}", "status": status,
+              "updated": f"{datetime.datetime.now():%Y-%m-%dT%H:%M:%S}"}
+    body = (TITLE + "".join(format_turn(entry) for entry in session_log)).encode("utf-8")
+    values["committed_bytes"] = len(_front_matter(values)) + len(body)
+    with open(path + ".tmp", "wb") as f:
+        f.write(_front_matter(values) + body)
+    os.replace(path + ".tmp", path)
+
+def _update_front_matter(f, values: dict):
+    f.seek(0)
+    f.write(_front_matter(values))
+    f.flush()
+    os.fsync(f.fileno())
+
+def _sync(path: str, state: dict, turns: int) -> dict:
+    """Makes sure `path` holds exactly the first `turns` turns of this session, rebuilding it if not. Returns its front-matter."""
+    values = read_front_matter(path)
+    if not values or values.get("session_id") != state['session_id'] or values.get("turns") != str(turns):
+        write_report(path, state['session_log'][:turns], state['session_id'], state['total_session_cost'])
+        values = read_front_matter(path)
+    return values
+
+def append_turn(path: str, state: dict):
+    """Commits the latest session_log turn: appends it after the committed turns and updates the front-matter in place."""
+    values = _sync(path, state, len(state['session_log']) - 1)
+    with open(path, "r+b") as f:
+        f.truncate(int(values["committed_bytes"]))
+        f.seek(0, os.SEEK_END)
+        f.write(format_turn(state['session_log'][-1]).encode("utf-8"))
+        values.update({"turns": len(state['session_log']), "status": "in progress", "total_cost": f"{state['total_session_cost']:.6f}",
+                       "updated": f"{datetime.datetime.now():%Y-%m-%dT%H:%M:%S}", "committed_bytes": f.tell()})
+        _update_front_matter(f, values)
+
+def open_draft(path: str, state: dict):
+    """
+    Returns the report open for appending the current turn's synthesis as it streams, after its heading.
+    The draft is replaced by the final text when the turn is committed with append_turn.
+    """
+    values = _sync(path, state, len(state['session_log']))
+    with open(path, "r+b") as f: f.truncate(int(values["committed_bytes"]))
+    f = open(path, "a", encoding="utf-8")
+    f.write(format_turn_heading(state['turn_counter'], state.get('last_user_input', '')))
+    f.flush()
+    return f
+
+def finalize(path: str, state: dict):
+    """Brings the report up to date with the session and marks it complete."""
+    values = _sync(path, state, len(state['session_log']))
+    with open(path, "r+b") as f:
+        f.truncate(int(values["committed_bytes"]))
+        values.update({"status": "complete", "updated": f"{datetime.datetime.now():%Y-%m-%dT%H:%M:%S}"})
+        _update_front_matter(f, values)
+
+# --- Reading and exporting ----------------------------------------------------
+
+def iter_turns(path: str):
+    """Yields {"turn", "user_prompt", "rapporteur_report"} for each committed turn, reading one line at a time."""
+    values = read_front_matter(path) or {}
+    limit = int(values["committed_bytes"]) if values.get("committed_bytes") else None
+    with open(path, "rb") as f:
+        lines = iter(f.readline, b"")
+        if limit is not None: lines = _until(lines, limit)
+        turn, section, prompt_lines, body = None, None, [], []
+        for raw in lines:
+            line = raw.decode("utf-8")
+            if line.startswith(TURN_HEADING) and (section is None or (body and body[-2:] == ["***\n", "\n"])):
+                if turn is not None: yield _turn_record(turn, prompt_lines, body[:-2])
+                turn, section, prompt_lines, body = int(line[len(TURN_HEADING):].strip()), "question", [], []
+            elif section == "question":
+                if line.startswith("> [!QUESTION]"): continue
+                if line.startswith(">"): prompt_lines.append(line[2:] if line.startswith("> ") else line[1:])
+                elif line.startswith(SYNTHESIS_HEADING): section = "synthesis"
+            elif section == "synthesis":
+                body.append(line)
+        if turn is not None: yield _turn_record(turn, prompt_lines, body)
+
+def _until(lines, limit: int):
+    read = 0
+    for line in lines:
+        read += len(line)
+        if read > limit: return
+        yield line
+
+def _turn_record(turn: int, prompt_lines: list, body: list) -> dict:
+    return {"turn": turn, "user_prompt": "".join(prompt_lines).rstrip("\n"), "rapporteur_report": "".join(body).strip("\n")}
+
+def export_json(path: str, out_path: str):
+    """Writes {"session": <front-matter>, "turns": [...]} one turn at a time."""
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write('{"session": ' + json.dumps(read_front_matter(path) or {}, ensure_ascii=False) + ', "turns": [')
+        for i, turn in enumerate(iter_turns(path)):
+            out.write((",\n" if i else "\n") + json.dumps(turn, ensure_ascii=False))
+        out.write("\n]}\n")
+
+def export_html(path: str, out_path: str):
+    """Writes a standalone HTML page, rendering each turn's Markdown as it is read."""
+    from markdown_it import MarkdownIt  # Installed with rich.
+    renderer = MarkdownIt("commonmark", {"html": False}).enable("table")  # Model output is untrusted: raw HTML is escaped.
+    values = read_front_matter(path) or {}
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>AI Council Session {html.escape(values.get('session_id', ''))}</title>\n"
+                  "<style>body{max-width:50rem;margin:auto;font-family:sans-serif}blockquote{border-left:4px solid #ccc;margin-left:0;padding-left:1rem}</style>"
+                  "</head><body>\n<h1>AI Council Session Report</h1>\n")
+        out.write(f"<p>Session {html.escape(values.get('session_id', ''))}: {html.escape(values.get('turns', '?'))} turn(s), "
+                  f"${html.escape(values.get('total_cost', '0'))}, {html.escape(values.get('status', ''))}.</p>\n")
+        for turn in iter_turns(path):
+            out.write(f"<hr>\n<h2>Turn {turn['turn']}</h2>\n<blockquote><p>{html.escape(turn['user_prompt'])}</p></blockquote>\n")
+            out.write(renderer.render(turn['rapporteur_report']) + "\n")
+        out.write("</body></html>\n")
+
+EXPORTERS = {"json": export_json, "html": export_html}
+
+def export(path: str, formats: list) -> list:
+    """Exports the report next to itself in each of `formats`; returns the paths written."""
+    written = []
+    for fmt in formats:
+        out_path = os.path.splitext(path)[0] + f".{fmt}"
+        EXPORTERS[fmt](path, out_path)
+        written.append(out_path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an AI Council Markdown report to other formats.")
+    parser.add_argument("report", help="Path to the session's Markdown report.")
+    parser.add_argument("--format", default="json,html", help=f"Comma-separated formats: {', '.join(EXPORTERS)}.")
+    args = parser.parse_args()
+    for out_path in export(args.report, [fmt.strip() for fmt in args.format.split(",")]): print(out_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ai_council/retrieval.py
+import os, re, json, math
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class DocumentIndex:
+    """
+    Local BM25 index over chunks of the documents attached to a session.
+    Each turn sends only the chunks most relevant to the current question instead
+    of the whole file. Persisted as JSON so a resumed session does not re-index.
+    """
+
+    def __init__(self, path: str, chunk_words: int = 300, overlap_words: int = 50, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.chunk_words, self.overlap_words = chunk_words, overlap_words
+        self.k1, self.b = k1, b
+        self.chunks = []  # {"source", "document", "text", "terms": {term: count}, "length"}
+        self.doc_freq = Counter()
+        self.documents = {}  # Document key (resolved path and page spec) -> version (content hash) indexed.
+        self.sources = set()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "DocumentIndex":
+        index = cls(path, **kwargs)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index.chunks, index.documents = data['chunks'], data['documents']
+            for chunk in index.chunks: index.doc_freq.update(chunk['terms'].keys())
+            index.sources = {chunk['source'] for chunk in index.chunks}
+        return index
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"chunks": self.chunks, "documents": self.documents}, f, ensure_ascii=False)
+
+    def _add_chunk(self, source: str, document: str, words: list):
+        text = " ".join(words)
+        terms = Counter(tokenize(text))
+        self.chunks.append({"source": source, "document": document, "text": text, "terms": dict(terms), "length": sum(terms.values())})
+        self.doc_freq.update(terms.keys())
+
+    def _remove_document(self, document: str):
+        kept = []
+        for chunk in self.chunks:
+            if chunk['document'] == document: self.doc_freq.subtract(chunk['terms'].keys())
+            else: kept.append(chunk)
+        self.chunks = kept
+        self.doc_freq = +self.doc_freq  # Drop terms whose count fell to zero.
+        self.sources = {chunk['source'] for chunk in self.chunks}
+        self.documents.pop(document, None)
+
+    def add_document(self, source: str, pages, document: str | None = None, version: str | None = None) -> int:
+        """
+        Indexes a document given as an iterable of page texts, streaming it into
+        overlapping word windows. `document` identifies the file (default: `source`) and
+        `version` its content; re-adding an unchanged document is a no-op, while a changed
+        one replaces its old chunks. Returns the number of chunks added.
+        """
+        document = document or source
+        if document in self.documents:
+            if version is not None and self.documents.get(document) == version: return 0
+            self._remove_document(document)
+        self.documents[document] = version
+        self.sources.add(source)
+        before, words = len(self.chunks), []
+        step = max(1, self.chunk_words - self.overlap_words)
+        for page in pages:
+            words.extend(page.split())
+            while len(words) >= self.chunk_words:
+                self._add_chunk(source, document, words[:self.chunk_words])
+                words = words[step:]
+        # Emit the tail unless it is wholly contained in the previous chunk's overlap.
+        if words and (len(self.chunks) == before or len(words) > self.overlap_words):
+            self._add_chunk(source, document, words)
+        return len(self.chunks) - before
+
+    def search(self, query: str, k: int = 6) -> list:
+        """Returns the top-k chunks by BM25 score, in document order."""
+        if not self.chunks: return []
+        n = len(self.chunks)
+        avg_length = sum(chunk['length'] for chunk in self.chunks) / n or 1
+        query_terms = set(tokenize(query))
+        scored = []
+        for position, chunk in enumerate(self.chunks):
+            score = 0.0
+            for term in query_terms:
+                if not (tf := chunk['terms'].get(term)): continue
+                idf = math.log(1 + (n - self.doc_freq[term] + 0.5) / (self.doc_freq[term] + 0.5))
+                score += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * chunk['length'] / avg_length))
+            if score > 0: scored.append((score, position))
+        # Fall back to the opening chunks when the question shares no terms with the documents.
+        top = sorted(scored, reverse=True)[:k] or [(0, position) for position in range(min(k, n))]
+        return [self.chunks[position] for _, position in sorted(top, key=lambda item: item[1])]
+
+    def context_for(self, query: str, k: int = 6) -> str:
+        """Formats the top-k chunks as the DOCUMENT CONTEXT block the council prompt expects."""
+        chunks = self.search(query, k)
+        if not chunks: return ""
+        body = "\n\n".join(f"[{chunk['source']}]\n{chunk['text']}" for chunk in chunks)
+        return f"--- DOCUMENT CONTEXT ---\n{body}\n--- END DOCUMENT CONTEXT ---\n\n"
@@ -0,0 +1,170 @@
+# ai_council/scheduler.py
+import time
+import random
+import asyncio
+import inspect
+import logging
+import contextlib
+from collections import deque
+
+logger = logging.getLogger("ai_council")
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+def provider_of(model: str) -> str:
+    """OpenRouter model ids are '<provider>/<model>'."""
+    return model.split("/", 1)[0]
+
+class TokenBucket:
+    """Simple token-bucket rate limiter: `rate_per_min` requests per minute with bursts up to `burst`."""
+
+    def __init__(self, rate_per_min: float, burst: int | None = None):
+        if rate_per_min <= 0: raise ValueError(f"Rate limit must be positive, got {rate_per_min} requests/minute")
+        self.rate = rate_per_min / 60
+        self.capacity = burst or max(1, int(self.rate * 10))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def retry_delay(error: Exception, attempt: int, base_s: float, max_s: float) -> float | None:
+    """
+    Seconds to wait before retrying `error`, or None if it is not worth retrying.
+    Honors Retry-After; otherwise full-jitter exponential backoff.
+    """
+    from openai import APIConnectionError  # Already loaded by the client that raised `error`.
+    status = getattr(error, "status_code", None)
+    if not (isinstance(error, APIConnectionError) or status in RETRYABLE_STATUS or (status or 0) >= 500):
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if (retry_after := headers.get("retry-after")) is not None: return min(max_s, float(retry_after))
+    except ValueError:
+        pass  # HTTP-date form; fall back to backoff.
+    return random.uniform(0, min(max_s, base_s * 2 ** attempt))
+
+class Scheduler:
+    """
+    Request layer shared by every LLM call: caps in-flight requests overall, per
+    provider and per model; applies token-bucket rate limits; retries transient
+    failures with backoff; and optionally hedges a request that runs past the
+    model's recent p95 latency by racing a duplicate against it.
+    """
+
+    def __init__(self, max_in_flight: int = 32, per_model: int = 8, model_limits: dict | None = None,
+                 per_provider: int | None = None, provider_limits: dict | None = None, rate_limits: dict | None = None,
+                 max_retries: int = 3, backoff_base_s: float = 1.0, backoff_max_s: float = 30.0,
+                 hedge: bool = False, hedge_min_samples: int = 10):
+        self.per_model, self.model_limits = per_model, model_limits or {}
+        self.per_provider, self.provider_limits = per_provider, provider_limits or {}
+        self.rate_limits = rate_limits or {}
+        self.max_retries, self.backoff_base_s, self.backoff_max_s = max_retries, backoff_base_s, backoff_max_s
+        self.hedge, self.hedge_min_samples = hedge, hedge_min_samples
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._models, self._providers, self._buckets = {}, {}, {}
+        self._latencies = {}
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> "Scheduler":
+        """Builds a scheduler from the [scheduler] section of models.toml; non-None overrides win. Unknown keys are ignored with a warning."""
+        known = inspect.signature(cls.__init__).parameters
+        options = {}
+        for key, value in config.items():
+            if key in known: options[key] = value
+            else: logger.warning("Ignoring unknown [scheduler] setting '%s'", key)
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**options)
+
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._models:
+            self._models[model] = asyncio.Semaphore(self.model_limits.get(model, self.per_model))
+        return self._models[model]
+
+    def _provider_semaphore(self, provider: str):
+        limit = self.provider_limits.get(provider, self.per_provider)
+        if limit is None: return contextlib.nullcontext()
+        if provider not in self._providers: self._providers[provider] = asyncio.Semaphore(limit)
+        return self._providers[provider]
+
+    async def _throttle(self, model: str):
+        # Rate limits may be configured per model id and/or per provider prefix.
+        for key in (model, provider_of(model)):
+            if key in self.rate_limits:
+                if key not in self._buckets: self._buckets[key] = TokenBucket(self.rate_limits[key])
+                await self._buckets[key].acquire()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model: str):
+        # Narrowest limit first so a backed-up model never parks on a wider slot.
+        async with self._model_semaphore(model):
+            async with self._provider_semaphore(provider_of(model)):
+                async with self._global:
+                    yield
+
+    def p95(self, model: str) -> float | None:
+        samples = self._latencies.get(model)
+        if not samples or len(samples) < self.hedge_min_samples: return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record_latency(self, model: str, seconds: float):
+        self._latencies.setdefault(model, deque(maxlen=100)).append(seconds)
+
+    async def _hedged(self, model: str, attempt, progress: dict) -> dict:
+        threshold = self.p95(model) if self.hedge else None
+        if threshold is None: return await attempt(progress)
+        primary = asyncio.create_task(attempt(progress))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done: return primary.result()
+            # The duplicate is a request like any other for the rate limits; give up on it if the primary finishes first.
+            tasks.append(token := asyncio.create_task(self._throttle(model)))
+            await asyncio.wait({primary, token}, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done(): return primary.result()
+            # The duplicate shares the original's slot: hedging trades spend for tail latency, not concurrency.
+            # Latency still runs from the slot's start; only the duplicate's TTFT is measured from its own.
+            hedge_progress = dict(progress, hedged=True, hedge_start=time.monotonic(), first_token=None, tokens=0)
+            tasks.append(hedge := asyncio.create_task(attempt(hedge_progress)))
+            progress["hedged"] = True
+            for finished in asyncio.as_completed([primary, hedge]):
+                result = await finished
+                if not result.get("error"): break
+            if hedge.done() and hedge.result() is result:
+                progress.update(hedge_progress)
+                result["hedged"] = True
+            return result
+        finally:
+            for task in tasks:
+                if not task.done(): task.cancel()
+
+    async def submit(self, model: str, attempt, progress: dict) -> dict:
+        """
+        Runs `attempt(progress)` (a coroutine function returning an ask_advisor-style
+        result dict) under this scheduler's limits, retrying retryable errors.
+        """
+        retries = 0
+        while True:
+            await self._throttle(model)
+            async with self.slot(model):
+                progress.update({"start": time.monotonic(), "first_token": None, "tokens": 0, "hedge_start": None})
+                if progress.get("slot_at") is None: progress["slot_at"] = progress["start"]  # Quorum deadlines run from here.
+                result = await self._hedged(model, attempt, progress)
+            if not result.get("error"):
+                self.record_latency(model, time.monotonic() - progress["start"])
+                break
+            delay = retry_delay(result["response"], retries, self.backoff_base_s, self.backoff_max_s) if retries < self.max_retries else None
+            if delay is None: break
+            retries += 1
+            progress["retries"] = retries
+            await asyncio.sleep(delay)
+        result["retries"] = retries
+        return result
@@ -0,0 +1,267 @@
+# ai_council/service.py
+"""
+Long-running HTTP service hosting many concurrent council sessions over one shared,
+pooled OpenRouter client. Turns stream back as server-sent events.
+
+    POST   /sessions                  {"models": ["<seat>", ...]}   -> {"session_id": ...}
+    GET    /sessions/<id>                                             -> session summary
+    POST   /sessions/<id>/turns       {"prompt": "..."}               -> text/event-stream
+    DELETE /sessions/<id>                                             -> writes the report, ends the session
+    GET    /metrics                                                   -> Prometheus text
+    GET    /healthz
+
+Each session lives in its own directory (journal and Markdown report); idle sessions
+are dropped from memory and reloaded from their journal on demand. A turn runs to
+completion even if its client disconnects. When more turns are running and queued than
+[service] allows, new turns are refused with 503 and Retry-After.
+"""
+import os, re, json, time, shutil, asyncio
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient  # A service always talks to the API, so no need to defer this.
+from . import blobs, council, report, session, utils
+from .cache import ResponseCache
+from .health import ModelHealth
+from .journal import SessionJournal
+from .scheduler import Scheduler
+from .telemetry import Telemetry
+
+SESSIONS_DIR = "sessions"
+SESSION_ID = re.compile(r"^\d{8}_\d{6}_[0-9a-f]{6}$")  # session.new_session_id(); nothing else becomes a path.
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: dict | None = None):
+        super().__init__(message)
+        self.status, self.headers = status, headers or {}
+
+def build_client(api_key: str, base_url: str, config: dict) -> AsyncOpenAI:
+    """One AsyncOpenAI client for every session, over a keep-alive pool sized for the service's concurrency."""
+    # Built from the SDK's own types: the HTTP library behind DefaultAsyncHttpxClient varies between openai releases.
+    Limits = type(openai.DEFAULT_CONNECTION_LIMITS)
+    http_client = DefaultAsyncHttpxClient(
+        limits=Limits(max_connections=config.get("max_connections", 200), max_keepalive_connections=config.get("max_keepalive", 50),
+                      keepalive_expiry=config.get("keepalive_expiry_s", 30)),
+        timeout=openai.Timeout(config.get("request_timeout_s", 120), connect=config.get("connect_timeout_s", 10)),
+    )
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0, http_client=http_client)
+
+class CouncilService:
+    def __init__(self, client: AsyncOpenAI, prompts: dict, settings: dict, scheduler: Scheduler,
+                 cache: ResponseCache | None = None, health: ModelHealth | None = None):
+        self.client, self.prompts, self.settings = client, prompts, settings
+        self.scheduler, self.cache, self.health = scheduler, cache, health
+        config = settings.get("service", {})
+        self.sessions_dir = config.get("sessions_dir", SESSIONS_DIR)
+        self.max_turns = config.get("max_turns_in_flight", 16)
+        self.max_queued = config.get("max_queued_turns", 32)
+        self.max_sessions_in_memory = config.get("max_sessions_in_memory", 256)
+        self._turn_slots = asyncio.Semaphore(self.max_turns)
+        self._turns_admitted = 0
+        self.sessions = {}
+        self.telemetry = Telemetry("service")
+        self._server = None
+
+    # --- Sessions ---------------------------------------------------------
+
+    def _session_dir(self, session_id: str) -> str:
+        if not SESSION_ID.match(session_id): raise HTTPError(404, f"No session {session_id}")
+        return os.path.join(self.sessions_dir, session_id)
+
+    def _remember(self, session_id: str, entry: dict) -> dict:
+        """Keeps `entry` in memory, evicting the least recently used idle sessions (their journals are up to date)."""
+        entry["used"] = time.monotonic()
+        self.sessions[session_id] = entry
+        idle = sorted((e["used"], sid) for sid, e in self.sessions.items() if not e["lock"].locked() and sid != session_id)
+        for _, sid in idle[:max(0, len(self.sessions) - self.max_sessions_in_memory)]:
+            del self.sessions[sid]
+        return entry
+
+    def create_session(self, seats: list | None = None) -> dict:
+        available = self.settings.get("models", {})
+        unknown = [seat for seat in seats or [] if seat not in available]
+        if unknown: raise HTTPError(400, f"Unknown council seats: {', '.join(unknown)}")
+        state = session.new_session_state()
+        state.update({
+            "selected_models": {seat: available[seat] for seat in seats} if seats else dict(available),
+            "rapporteur_model_id": self.settings.get("rapporteur", {}).get("model"), "output_filename": "report.md",
+        })
+        os.makedirs(self._session_dir(state['session_id']), exist_ok=True)
+        entry = self._remember(state['session_id'], {
+            "state": state, "lock": asyncio.Lock(),
+            "journal": SessionJournal(os.path.join(self._session_dir(state['session_id']), "journal.jsonl"), blobs.store),
+        })
+        entry["journal"].save(state)
+        return entry
+
+    def get_session(self, session_id: str) -> dict:
+        """Returns a live session, reloading it from its journal after a restart."""
+        if not SESSION_ID.match(session_id): raise HTTPError(404, f"No session {session_id}")
+        if session_id in self.sessions: return self._remember(session_id, self.sessions[session_id])
+        journal = SessionJournal(os.path.join(self._session_dir(session_id), "journal.jsonl"), blobs.store)
+        if not journal.exists(): raise HTTPError(404, f"No session {session_id}")
+        return self._remember(session_id, {"state": journal.load(), "lock": asyncio.Lock(), "journal": journal})
+
+    def summary(self, state: dict) -> dict:
+        return {
+            "session_id": state['session_id'], "turns": len(state['session_log']), "seats": state['selected_models'],
+            "total_cost": state['total_session_cost'], "last_report": state['last_rapporteur_report'],
+        }
+
+    def end_session(self, session_id: str) -> str:
+        entry = self.get_session(session_id)
+        if entry["lock"].locked(): raise HTTPError(409, "A turn is still running for this session")
+        state = entry["state"]
+        report_path = os.path.join(self.sessions_dir, f"{session_id}.md")
+        if state['session_log']:
+            draft = os.path.join(self._session_dir(session_id), state['output_filename'])
+            report.finalize(draft, state)
+            os.replace(draft, report_path)
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+        del self.sessions[session_id]
+        return report_path
+
+    # --- Turns ------------------------------------------------------------
+
+    def admit_turn(self):
+        """Backpressure: refuse a turn outright rather than queue it without bound."""
+        if self._turns_admitted >= self.max_turns + self.max_queued:
+            raise HTTPError(503, "Too many turns in flight; retry shortly", {"Retry-After": "5"})
+        self._turns_admitted += 1
+
+    async def run_turn(self, entry: dict, prompt: str, on_event) -> dict:
+        """Runs one turn for a session (turns of one session never overlap) and journals the result."""
+        try:
+            async with entry["lock"], self._turn_slots:
+                state = entry["state"]
+                is_follow_up = bool(state['session_log'])
+                state['last_user_input'] = prompt
+                council_prompt = council.follow_up_prompt(state['last_rapporteur_report'], prompt) if is_follow_up else prompt
+                on_event("turn_started", {"turn": state['turn_counter']})
+                state = await council.run_turn(self.client, state, self.prompts, council_prompt, self.settings, self.cache, self.scheduler,
+                                               headless=True, telemetry=self.telemetry, health=self.health, on_event=on_event)
+                turn_stats = self.telemetry.turn_summary(state['turn_counter'], state['session_id'])
+                state['session_log'].append({"turn": state['turn_counter'], "user_prompt": prompt, "rapporteur_report": state['last_rapporteur_report'],
+                                             "total_cost": state['total_session_cost'], "turn_cost": turn_stats['cost']})
+                state['turn_counter'] += 1
+                entry["journal"].save(state)
+                report.append_turn(os.path.join(self._session_dir(state['session_id']), state['output_filename']), state)
+                return {"turn": state['turn_counter'] - 1, "report": state['last_rapporteur_report'], "turn_cost": turn_stats['cost'],
+                        "total_cost": state['total_session_cost']}
+        finally:
+            self._turns_admitted -= 1
+
+    # --- HTTP -------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        await council.drain_stragglers()
+        await self.telemetry.close()
+        if self.health: self.health.save()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            if not request_line: return
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            try:
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict): raise HTTPError(400, "Request body must be a JSON object")
+                await self._route(method, path.split("?", 1)[0].rstrip("/"), payload, writer)
+            except HTTPError as e:
+                await self._send(writer, e.status, {"error": str(e)}, e.headers)
+            except json.JSONDecodeError:
+                await self._send(writer, 400, {"error": "Request body must be JSON"})
+            except ConnectionError:
+                raise
+            except Exception as e:
+                utils.logger.error("Unhandled error for %s %s: %s", method, path, e, exc_info=True)
+                await self._send(writer, 500, {"error": "Internal server error"})
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: dict, writer):
+        parts = path.strip("/").split("/")
+        if path == "/healthz": return await self._send(writer, 200, {"sessions": len(self.sessions), "turns_admitted": self._turns_admitted})
+        if path == "/metrics": return await self._send_text(writer, self.telemetry.prometheus_text())
+        if parts[0] != "sessions": raise HTTPError(404, f"No route for {path}")
+        if len(parts) == 1 and method == "POST":
+            models = body.get("models")
+            if models is not None and not (isinstance(models, list) and all(isinstance(seat, str) for seat in models)):
+                raise HTTPError(400, "'models' must be a list of seat names")
+            entry = self.create_session(models)
+            return await self._send(writer, 201, self.summary(entry["state"]))
+        if len(parts) == 2 and method == "GET": return await self._send(writer, 200, self.summary(self.get_session(parts[1])["state"]))
+        if len(parts) == 2 and method == "DELETE": return await self._send(writer, 200, {"report": self.end_session(parts[1])})
+        if len(parts) == 3 and parts[2] == "turns" and method == "POST":
+            if not isinstance(prompt := body.get("prompt", ""), str): raise HTTPError(400, "'prompt' must be a string")
+            if not (prompt := prompt.strip()): raise HTTPError(400, "A turn needs a 'prompt'")
+            entry = self.get_session(parts[1])
+            self.admit_turn()
+            return await self._stream_turn(entry, prompt, writer)
+        raise HTTPError(405 if parts[0] == "sessions" and len(parts) <= 3 else 404, f"{method} {path} is not supported")
+
+    async def _stream_turn(self, entry: dict, prompt: str, writer):
+        events = asyncio.Queue()
+        turn = asyncio.create_task(self.run_turn(entry, prompt, lambda kind, data: events.put_nowait((kind, data))))
+        turn.add_done_callback(lambda task: events.put_nowait(None))
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        connected = True
+        while (event := await events.get()) is not None:
+            if connected: connected = await self._write_event(writer, *event)
+        if turn.cancelled():
+            utils.logger.warning("Turn for session %s was cancelled", entry["state"]['session_id'])
+            if connected: await self._write_event(writer, "error", {"error": "Turn was cancelled"})
+        elif turn.exception():
+            utils.logger.warning("Turn for session %s failed: %s", entry["state"]['session_id'], turn.exception())
+            if connected: await self._write_event(writer, "error", {"error": str(turn.exception())})
+        elif connected:
+            await self._write_event(writer, "done", turn.result())
+
+    async def _write_event(self, writer, kind: str, data: dict) -> bool:
+        """Writes one SSE event; returns False once the client has gone away (the turn keeps running)."""
+        try:
+            writer.write(f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode())
+            await writer.drain()
+            return True
+        except ConnectionError:
+            return False
+
+    async def _send(self, writer, status: int, payload: dict, extra_headers: dict | None = None):
+        await self._send_text(writer, json.dumps(payload), status, "application/json", extra_headers)
+
+    async def _send_text(self, writer, text: str, status: int = 200, content_type: str = "text/plain; version=0.0.4", extra_headers: dict | None = None):
+        body = text.encode()
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+async def serve(client: AsyncOpenAI, prompts: dict, settings: dict, scheduler: Scheduler, cache: ResponseCache | None = None,
+                health: ModelHealth | None = None, host: str = "127.0.0.1", port: int = 8080):
+    """Runs the service until cancelled (Ctrl+C)."""
+    service = CouncilService(client, prompts, settings, scheduler, cache, health)
+    port = await service.start(host, port)
+    utils.open_audit_log(f"service_{session.new_session_id()}")
+    utils.logger.info("AI Council service listening on http://%s:%d", host, port)
+    try:
+        while True:
+            await asyncio.sleep(60)
+            service.telemetry.export()
+            if health: health.save()
+    finally:
+        await service.close()
+        utils.close_audit_log()
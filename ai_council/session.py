@@ -1,31 +1,55 @@
 # ai_council/session.py
 import os
 import json
+import uuid
+import datetime
+from . import blobs, report, utils
+from .journal import SessionJournal
 
-SESSION_FILE = "session_state.json"
+SESSION_FILE = "session_journal.jsonl"
+LEGACY_SESSION_FILE = "session_state.json"  # Full-state JSON written before the journal; resumed once, then migrated.
+INDEX_FILE = "session_index.json"
+
+_journal = SessionJournal(SESSION_FILE, blobs.store)
+
+def _remove_session_files():
+    _journal.remove()
+    for path in (LEGACY_SESSION_FILE, INDEX_FILE):
+        if os.path.exists(path): os.remove(path)
+
+def _load_legacy_session() -> dict:
+    """Reads a pre-journal session file and makes it the journal's first snapshot."""
+    with open(LEGACY_SESSION_FILE, 'r', encoding='utf-8') as f: state = {**new_session_state(), **json.load(f)}
+    _journal.compact(state)
+    os.remove(LEGACY_SESSION_FILE)
+    return state
 
 def load_or_initialize_session() -> dict:
     """
     Checks for a session file. If found and user confirms, loads the state.
     Otherwise, returns a blank state template for a new session.
     """
-    if os.path.exists(SESSION_FILE):
+    if _journal.exists() or os.path.exists(LEGACY_SESSION_FILE):
         resume = input("A previous session was found. Resume it? (y/n): ").lower()
         if resume == 'y':
             print("... Resuming previous session ...")
             try:
-                with open(SESSION_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
+                return _journal.load() if _journal.exists() else _load_legacy_session()
+            except (json.JSONDecodeError, ValueError, KeyError, FileNotFoundError):
                 print("Error reading session file. Starting a new session.")
-                os.remove(SESSION_FILE)
+                _remove_session_files()
         else:
             # User chose not to resume, so clean up and start fresh.
-            os.remove(SESSION_FILE)
+            _remove_session_files()
     
     # Return a blank template for a new session.
     # main.py will be responsible for filling this out.
+    return new_session_state()
+
+def new_session_state() -> dict:
+    """Blank state template for a new session."""
     return {
+        "session_id": new_session_id(),
         "running": True,
         "selected_models": {},
         "rapporteur_model_id": None,
@@ -38,36 +62,26 @@ def load_or_initialize_session() -> dict:
         "last_user_input": ""
     }
 
+def new_session_id() -> str:
+    return f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+
 def save_session_state(state: dict):
-    """Saves the entire current session state to the JSON file."""
-    with open(SESSION_FILE, 'w', encoding='utf-8') as f:
-        json.dump(state, f, indent=2)
+    """Appends this turn's changes to the session journal (a full snapshot on first save and at compaction)."""
+    _journal.save(state)
+
+def report_path(state: dict) -> str:
+    return os.path.join("output", state.get('output_filename', 'council_report.md'))
 
-def end_session(state: dict):
-    """Writes the final Markdown report and cleans up the session file."""
+def end_session(state: dict, export_formats: list = ()):
+    """Marks the Markdown report complete, writes any configured exports and cleans up the session file."""
     print("\nSession ended.")
+    utils.close_audit_log()
     if state['session_log']:
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        filename = state.get('output_filename', 'council_report.md')
-        full_path = os.path.join(output_dir, filename)
-        
-        # --- FIX IS HERE ---
-        # The following lines are now correctly indented inside the 'with' block.
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write("# 🏛️ AI Council Session Report\n\n")
-            f.write("This document contains the complete transcript of the AI Council session.\n\n")
-            for turn in state['session_log']:
-                f.write(f"***\n\n## 🔄 Turn {turn['turn']}\n\n")
-                # Ensure user_prompt exists before replacing
-                user_prompt = turn.get('user_prompt', '').replace('\n', '\n> ')
-                f.write(f"> [!QUESTION] User Input for Turn {turn['turn']}\n> {user_prompt}\n\n")
-                f.write("### 🧠 Rapporteur's Synthesis\n\n")
-                f.write(f"{turn.get('rapporteur_report', 'No report generated.')}\n\n")
-        # --- END FIX ---
-        
+        full_path = report_path(state)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        report.finalize(full_path, state)
         print(f"\n[+] Obsidian-friendly session report exported to {full_path}")
+        for out_path in report.export(full_path, list(export_formats)):
+            print(f"[+] Report exported to {out_path}")
 
-    if os.path.exists(SESSION_FILE):
-        os.remove(SESSION_FILE)
\ No newline at end of file
+    _remove_session_files()
@@ -0,0 +1,165 @@
+# ai_council/telemetry.py
+import os, json, time, datetime, threading
+
+LOG_DIR = "logs"
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+MAX_TRACKED_TURNS = 1000  # Per-turn totals kept in memory; a long-running service would otherwise grow without bound.
+
+def error_class(result: dict) -> str | None:
+    if not result.get("error"): return None
+    error = result.get("response")
+    return type(error).__name__ if isinstance(error, Exception) else str(error)
+
+def make_span(call_type: str, model: str, result: dict, session_id: str | None = None, turn: int | None = None) -> dict:
+    """One telemetry span for an LLM call, built from an ask_advisor-style result dict."""
+    usage = result.get("usage") or {}
+    return {
+        "timestamp": time.time(), "session_id": session_id, "turn": turn, "call_type": call_type,
+        "advisor": result.get("advisor"), "model": model,
+        "queue_s": result.get("queue_time", 0.0), "ttft_s": result.get("ttft"), "latency_s": result.get("latency", 0.0),
+        "prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": usage.get("cached_tokens", 0), "cost": result.get("cost", 0.0),
+        "retries": result.get("retries", 0), "error_class": error_class(result),
+        "response_cached": bool(result.get("cached")), "hedged": bool(result.get("hedged")),
+    }
+
+def _empty_totals() -> dict:
+    return {"calls": 0, "errors": 0, "cost": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "latency_s": 0.0, "retries": 0}
+
+def _add(totals: dict, span: dict):
+    totals["calls"] += 1
+    totals["errors"] += span["error_class"] is not None
+    for key in ("cost", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_s", "retries"):
+        totals[key] += span[key] or 0
+
+class Telemetry:
+    """
+    Collects a span per LLM call (advisor, rapporteur, slug), aggregates them per
+    (session, turn) and overall, and exports them as monthly JSONL files plus a Prometheus text
+    file. Prometheus counters are cumulative across sessions (persisted next to the
+    text file) and can also be served over HTTP at /metrics.
+    """
+
+    def __init__(self, session_id: str, log_dir: str = LOG_DIR):
+        self.session_id = session_id
+        self.log_dir = log_dir
+        self._unexported = []
+        self.turns = {}
+        self.session = _empty_totals()
+        self._prom_state_path = os.path.join(log_dir, "metrics_state.json")
+        self._prom = self._load_prom_state()
+        self._prom_lock = threading.Lock()  # Scrapes are served from another thread.
+        self._server = None
+
+    def record(self, call_type: str, model: str, result: dict, turn: int | None = None, session_id: str | None = None) -> dict:
+        span = make_span(call_type, model, result, session_id or self.session_id, turn)
+        self._unexported.append(span)
+        if turn is not None:
+            key = (span["session_id"], turn)
+            if key not in self.turns:
+                self.turns[key] = _empty_totals()
+                if len(self.turns) > MAX_TRACKED_TURNS: del self.turns[next(iter(self.turns))]
+            totals = self.turns[key]
+            _add(totals, span)
+            if span["call_type"] == "advisor" and not span["error_class"] and span["latency_s"] > totals.get("slowest", {}).get("latency_s", -1):
+                totals["slowest"] = {"advisor": span["advisor"], "latency_s": span["latency_s"]}
+        _add(self.session, span)
+        with self._prom_lock: self._observe(span)
+        return span
+
+    def turn_summary(self, turn: int, session_id: str | None = None) -> dict:
+        return dict(self.turns.get((session_id or self.session_id, turn)) or _empty_totals())
+
+    # --- Prometheus -------------------------------------------------------
+
+    def _load_prom_state(self) -> dict:
+        try:
+            with open(self._prom_state_path, "r", encoding="utf-8") as f: return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"counters": {}, "histograms": {}}
+
+    def _observe(self, span: dict):
+        labels = f'model="{span["model"]}",call_type="{span["call_type"]}"'
+        status = "error" if span["error_class"] else "ok"
+        counters = self._prom["counters"]
+        for name, value in (
+            (f'ai_council_llm_calls_total{{{labels},status="{status}"}}', 1),
+            (f"ai_council_llm_cost_usd_total{{{labels}}}", span["cost"]),
+            (f'ai_council_llm_tokens_total{{{labels},kind="prompt"}}', span["prompt_tokens"]),
+            (f'ai_council_llm_tokens_total{{{labels},kind="completion"}}', span["completion_tokens"]),
+            (f'ai_council_llm_tokens_total{{{labels},kind="cached"}}', span["cached_tokens"]),
+            (f"ai_council_llm_retries_total{{{labels}}}", span["retries"]),
+        ):
+            counters[name] = counters.get(name, 0) + (value or 0)
+        if span["error_class"] or span["response_cached"]: return  # Only real completions feed the latency histograms.
+        for metric, value in (("ai_council_llm_latency_seconds", span["latency_s"]), ("ai_council_llm_ttft_seconds", span["ttft_s"])):
+            if value is None: continue
+            histogram = self._prom["histograms"].setdefault(f"{metric}|{labels}", {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound: histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def prometheus_text(self) -> str:
+        with self._prom_lock: return self._render_prom()
+
+    def _render_prom(self) -> str:
+        lines, typed = [], set()
+        for name, value in sorted(self._prom["counters"].items()):
+            metric = name.split("{", 1)[0]
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter"); typed.add(metric)
+            lines.append(f"{name} {value}")
+        for key, histogram in sorted(self._prom["histograms"].items()):
+            metric, labels = key.split("|", 1)
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram"); typed.add(metric)
+            for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram['sum']}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    # --- Export -----------------------------------------------------------
+
+    def export(self):
+        """Appends new spans to logs/spans-YYYY-MM.jsonl and rewrites logs/metrics.prom (atomically)."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        if self._unexported:
+            path = os.path.join(self.log_dir, f"spans-{datetime.date.today():%Y-%m}.jsonl")
+            with open(path, "a", encoding="utf-8") as f:
+                for span in self._unexported: f.write(json.dumps(span) + "\n")
+            self._unexported = []
+        for path, content in ((self._prom_state_path, json.dumps(self._prom)), (os.path.join(self.log_dir, "metrics.prom"), self.prometheus_text())):
+            with open(path + ".tmp", "w", encoding="utf-8") as f: f.write(content)
+            os.replace(path + ".tmp", path)
+
+    def serve_metrics(self, port: int, host: str = "127.0.0.1"):
+        """
+        Serves the Prometheus text format at http://host:port/metrics from a daemon thread, so scrapes
+        are answered while the event loop is blocked (e.g. the interactive CLI waiting on input()).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        telemetry = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = telemetry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would otherwise print over the interactive prompt.
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+
+    async def close(self):
+        self.export()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
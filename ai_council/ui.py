@@ -1,11 +1,9 @@
 # ai_council/ui.py
 
-import os, re, time, asyncio, fitz
-from rich.live import Live
-from rich.table import Table
-from rich.spinner import Spinner
+import os, re, time, asyncio
 from rich.console import Console
-from rich.markdown import Markdown
+from . import extract, utils
+# rich.live, rich.markdown (markdown-it) and rich.table are imported where first used, to keep startup fast.
 
 console = Console()
 
@@ -30,29 +28,31 @@ def select_models(available_models: dict) -> dict:
             else: console.print("Invalid number detected.", style="red")
         except ValueError: console.print("Invalid input.", style="red")
 
-def get_document_context() -> str:
-    # This function is correct and remains the same.
+async def get_document_context() -> list:
+    """
+    Asks for optional files to attach, extracting them off the event loop.
+    Returns a list of (label, document key, extraction cache path) triples; empty if nothing was attached.
+    The key (resolved path and page spec) tells the index when an attached file replaces an earlier version.
+    """
     while True:
-        add_doc = input("Add a file for context (txt, md, pdf)? (y/n): ").lower()
-        if add_doc == 'n': return ""
+        add_doc = input("Add files for context (txt, md, pdf)? (y/n): ").lower()
+        if add_doc == 'n': return []
         if add_doc == 'y':
-            raw_path = input("Please provide the full path to the file: ")
-            file_path = raw_path.strip().strip('"').strip("'")
-            if not os.path.exists(file_path):
-                console.print(f"❌ ERROR: File not found at '{file_path}'. Please try again.", style="red")
-                continue
-            try:
-                content = ""
-                if file_path.lower().endswith('.pdf'):
-                    with fitz.open(file_path) as doc: content = "".join(page.get_text() for page in doc)
-                elif file_path.lower().endswith(('.txt', '.md')):
-                    with open(file_path, 'r', encoding='utf-8') as f: content = f.read()
-                else:
-                    console.print("❌ ERROR: Unsupported file type.", style="red"); continue
-                
-                console.print(f"✅ Loaded {len(content):,} characters from {os.path.basename(file_path)}.", style="green")
-                return f"--- DOCUMENT CONTEXT ---\n{content}\n--- END DOCUMENT CONTEXT ---\n\n"
-            except Exception as e: console.print(f"❌ ERROR: Could not read file: {e}", style="red")
+            raw_paths = input("Full path(s), separated by ';' (append ':1-20,25' to a PDF to select pages): ")
+            documents = []
+            for raw_path in filter(str.strip, raw_paths.split(";")):
+                file_path, page_spec = extract.split_path_and_pages(raw_path)
+                if not os.path.exists(file_path):
+                    console.print(f"❌ ERROR: File not found at '{file_path}'.", style="red")
+                    continue
+                label = os.path.basename(file_path) + (f" (pp. {page_spec})" if page_spec else "")
+                try:
+                    cache_path, pages, cached = await extract.extract_document(file_path, page_spec)
+                    console.print(f"✅ Loaded {pages:,} page(s) from {label}{' (cached)' if cached else ''}.", style="green")
+                    documents.append((label, os.path.realpath(file_path) + (f":{page_spec}" if page_spec else ""), cache_path))
+                except Exception as e: console.print(f"❌ ERROR: Could not read {label}: {e}", style="red")
+            if documents: return documents
+            console.print("No files were loaded. Please try again.", style="red")
         else: console.print("Invalid input.", style="red")
 
 def get_initial_prompt(templates: dict) -> str:
@@ -92,6 +92,7 @@ def get_initial_prompt(templates: dict) -> str:
                             f"**`{{{placeholder}}}`**" # Use Markdown bold/code for highlight
                         )
                         
+                        from rich.markdown import Markdown
                         console.print(f"\nTemplate Context for '[bold magenta]{placeholder}[/bold magenta]':")
                         # Display the full template with the highlight inside a quote block
                         console.print(Markdown(f"> {highlighted_template}"))
@@ -118,52 +119,210 @@ def get_follow_up_input(turn_counter: int) -> str:
     user_input = input("Type 'quit' to exit > ")
     return user_input
 
-def generate_status_table(statuses: dict) -> Table:
-    """Creates the rich Table for the live progress dashboard."""
-    table = Table(title="AI Council Status", expand=True, border_style="blue")
+def _status_row(name: str, data: dict, stream: dict, now: float) -> tuple:
+    from rich.spinner import Spinner
+    advisor = f"{name}\n[dim]↪ fallback {stream['fallback_for']} → {stream['model']}[/dim]" if stream.get('fallback_for') else name
+    if "Querying" in data['status'] and stream.get('start') is None:
+        status_display = "[dim]⏸ Waiting[/dim]"  # Held back by the dispatch fan-out limit.
+    elif "Querying" in data['status']:
+        status_text = data['status']
+        if stream.get('retries'): status_text += f" (retry {stream['retries']})"
+        if stream.get('hedged'): status_text += " (hedged)"
+        status_display = Spinner("dots", text=f"[yellow]{status_text}[/yellow]")
+    elif "Done" in data['status']:
+        status_display = f"[green]{data['status']}[/green]"
+    elif "Late" in data['status']:
+        status_display = f"[yellow]{data['status']}[/yellow]"
+    elif "Skipped" in data['status']:
+        status_display = f"[dim]{data['status']} ({data.get('error_msg')})[/dim]"
+    else: # Error
+        error_msg = data.get('error_msg', 'Unknown Error')
+        status_display = f"[red]❌ Error: {error_msg}[/red]"
+    ttft_str = tokens_str = rate_str = ""
+    if stream.get('first_token') is not None:
+        ttft_str = f"{stream['first_token'] - (stream.get('hedge_start') or stream['start']):.2f}"
+        tokens_str = f"{stream['tokens']:,}"
+        # Freeze the rate at completion so finished rows stop decaying.
+        end = stream.get('end') or now
+        if (streaming_for := end - stream['first_token']) > 0:
+            rate_str = f"{stream['tokens'] / streaming_for:.1f}"
+    time_str = f"{data['time']:.2f}" if data['time'] > 0 else ""
+    return (advisor, status_display, ttft_str, tokens_str, rate_str, time_str)
+
+def generate_status_table(statuses: dict, progress: dict | None = None, rows: dict | None = None, title: str = "AI Council Status") -> "Table":
+    """
+    Creates the rich Table for the live progress dashboard. With a `rows` cache (kept across
+    refreshes), only rows whose advisor's status or stream has changed are rebuilt.
+    """
+    from rich.table import Table
+    progress = progress or {}
+    table = Table(title=title, expand=True, border_style="blue")
     table.add_column("Advisor", style="cyan", no_wrap=True)
     table.add_column("Status")
+    table.add_column("TTFT (s)", style="magenta", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Tok/s", style="magenta", justify="right")
     table.add_column("Time (s)", style="green", justify="right")
+    now = time.monotonic()
     for name, data in statuses.items():
-        if "Querying" in data['status']:
-            status_display = Spinner("dots", text=f"[yellow]{data['status']}[/yellow]")
-        elif "Done" in data['status']:
-            status_display = f"[green]{data['status']}[/green]"
-        else: # Error
-            error_msg = data.get('error_msg', 'Unknown Error')
-            status_display = f"[red]❌ Error: {error_msg}[/red]"
-        time_str = f"{data['time']:.2f}" if data['time'] > 0 else ""
-        table.add_row(name, status_display, time_str)
+        stream = progress.get(name, {})
+        if rows is None:
+            table.add_row(*_status_row(name, data, stream, now))
+            continue
+        signature = (data['status'], data['time'], stream.get('start'), stream.get('tokens'), stream.get('retries'), stream.get('hedged'), stream.get('end'))
+        if name not in rows or rows[name][0] != signature:
+            rows[name] = (signature, _status_row(name, data, stream, now))
+        table.add_row(*rows[name][1])
     return table
 
-async def live_council_progress(tasks: list) -> list:
-    """Manages the live display of the council's progress using rich.Live."""
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 30, 60)
+
+def generate_council_summary(statuses: dict, progress: dict | None = None, rows: dict | None = None, top_n: int = 10):
+    """Aggregated dashboard for large councils: status counts, a latency histogram and the `top_n` slowest advisors."""
+    from rich.console import Group
+    from rich.table import Table
+    progress = progress or {}
+    now = time.monotonic()
+    counts = {"✅ Done": 0, "⏳ Querying": 0, "⏸ Waiting": 0, "⏳ Late": 0, "❌ Error": 0, "⏭ Skipped": 0}
+    buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    elapsed = {}
+    for name, data in statuses.items():
+        stream = progress.get(name, {})
+        if "Querying" in data['status']:
+            if stream.get('start') is None:
+                counts["⏸ Waiting"] += 1
+                continue
+            counts["⏳ Querying"] += 1
+            elapsed[name] = now - stream['start']
+        else:
+            counts[next((key for key in counts if key.split()[1] in data['status']), "❌ Error")] += 1
+            if data['time'] > 0: elapsed[name] = data['time']
+            if "Done" in data['status']:
+                buckets[next((i for i, edge in enumerate(LATENCY_BUCKETS) if data['time'] < edge), len(LATENCY_BUCKETS))] += 1
+    header = f"[bold]{len(statuses)} advisors[/bold]  " + "  ".join(f"{label} {count}" for label, count in counts.items() if count)
+    histogram = Table(title="Time to answer (finished advisors)", box=None, show_header=False, padding=(0, 1))
+    labels = [f"< {LATENCY_BUCKETS[0]}s"] + [f"{low}-{high}s" for low, high in zip(LATENCY_BUCKETS, LATENCY_BUCKETS[1:])] + [f"≥ {LATENCY_BUCKETS[-1]}s"]
+    widest = max(buckets) or 1
+    for label, count in zip(labels, buckets):
+        histogram.add_row(label, f"[green]{'█' * round(30 * count / widest)}[/green]", str(count))
+    slowest = sorted(elapsed, key=elapsed.get, reverse=True)[:top_n]
+    table = generate_status_table({name: statuses[name] for name in slowest}, progress, rows, title=f"Slowest {len(slowest)} advisors")
+    return Group(header, histogram, table)
+
+async def live_council_progress(tasks: list, progress: dict | None = None, quorum: int | None = None, deadline_s: float | None = None,
+                                skipped: dict | None = None, aggregate_above: int | None = None, top_n: int = 10, started_at=None) -> list:
+    """
+    Manages the live display of the council's progress using rich.Live.
+    Returns as soon as `quorum` advisors have answered or `deadline_s` has passed;
+    tasks still running at that point are left untouched for the caller to handle.
+    `skipped` maps seats left out of this turn to the reason, for display only.
+    A council of more than `aggregate_above` seats gets the aggregated summary instead of one row per seat.
+    `started_at` is passed to utils.wait_for_quorum.
+    """
+    from rich.live import Live
     model_statuses = {task.get_name(): {"status": "Querying...", "time": 0} for task in tasks}
+    model_statuses.update({name: {"status": "⏭ Skipped", "time": 0, "error_msg": reason} for name, reason in (skipped or {}).items()})
     start_time = time.time()
-    results = []
-    with Live(generate_status_table(model_statuses), console=console, refresh_per_second=10, vertical_overflow="visible") as live:
-        for task in asyncio.as_completed(tasks):
-            result = await task
-            advisor_name = result['advisor']
-            elapsed = time.time() - start_time
-            if result.get("error"):
-                model_statuses[advisor_name]['status'] = "❌ Error"
-                model_statuses[advisor_name]['error_msg'] = str(result.get('response', 'N/A'))
-            else:
-                model_statuses[advisor_name]['status'] = "✅ Done"
-            model_statuses[advisor_name]['time'] = elapsed
-            results.append(result)
-            live.update(generate_status_table(model_statuses))
-    console.print("\n...Council deliberation complete...", style="bold green")
+
+    def on_result(result: dict):
+        advisor_name = result['advisor']
+        if result.get("error"):
+            model_statuses[advisor_name]['status'] = "❌ Error"
+            model_statuses[advisor_name]['error_msg'] = str(result.get('response', 'N/A'))
+        else:
+            model_statuses[advisor_name]['status'] = "✅ Done (cached)" if result.get("cached") else "✅ Done"
+        model_statuses[advisor_name]['time'] = time.time() - start_time
+
+    rows = {}
+    large = aggregate_above is not None and len(model_statuses) > aggregate_above
+    render = (lambda: generate_council_summary(model_statuses, progress, rows, top_n)) if large else (lambda: generate_status_table(model_statuses, progress, rows))
+    # get_renderable lets every refresh pick up streamed token counts, not just task completions.
+    with Live(console=console, refresh_per_second=4 if large else 10, vertical_overflow="visible", get_renderable=render):
+        results = await utils.wait_for_quorum(tasks, quorum, deadline_s, on_result, started_at)
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            model_statuses[task.get_name()]['status'] = "⏳ Late"
+    if pending:
+        console.print(f"\n...Quorum reached, moving on without {len(pending)} straggler(s)...", style="bold yellow")
+    else:
+        console.print("\n...Council deliberation complete...", style="bold green")
     return results
 
-def display_rapporteur_report(report: str):
-    """Renders the Rapporteur's Markdown report to the terminal."""
+def _display_report_banner():
     console.print("\n" + "="*50, style="bold blue")
     console.print("           COUNCIL FACILITATOR'S REPORT", style="bold blue")
     console.print("="*50, style="bold blue")
+
+def display_rapporteur_report(report: str, banner: bool = True):
+    """Renders the Rapporteur's Markdown report to the terminal."""
+    from rich.markdown import Markdown
+    if banner: _display_report_banner()
     console.print(Markdown(report))
 
-def display_turn_telemetry(turn_cost: float, total_cost: float, turn: int):
+def complete_blocks_length(text: str) -> int:
+    """Length of the prefix of `text` made of finished Markdown blocks (up to the last blank line outside a code fence)."""
+    end, pos, in_fence = 0, 0, False
+    while (newline := text.find("\n", pos)) != -1:
+        line = text[pos:newline].strip()
+        if line.startswith(("```", "~~~")): in_fence = not in_fence
+        elif not line and not in_fence: end = newline + 1
+        pos = newline + 1
+    return end
+
+async def stream_rapporteur_report(task: asyncio.Task, progress: dict, sink=None) -> dict:
+    """
+    Renders the Rapporteur's report while it streams and returns the Rapporteur's result.
+    Finished Markdown blocks are printed once and appended to `sink`; only the unfinished
+    tail is re-parsed on each refresh, so the cost per refresh does not grow with the report.
+    """
+    from rich.live import Live
+    from rich.spinner import Spinner
+    from rich.markdown import Markdown
+    _display_report_banner()
+    spinner = Spinner("earth", text="[bold green]Rapporteur is compiling the report...")
+    sink_start = sink.tell() if sink else 0
+    parts, seen, pending, shown = None, 0, "", False
+    with Live(spinner, console=console, refresh_per_second=8, transient=True, vertical_overflow="visible") as live:
+        while True:
+            done = task.done()
+            if progress.get("parts") is not parts:
+                # A retry or a winning hedge starts a new stream; start the report over.
+                if shown or pending:
+                    live.console.print("[dim]... the Rapporteur's response restarted, showing the new attempt ...[/dim]")
+                    if sink: sink.seek(sink_start); sink.truncate()
+                parts, seen, pending = progress.get("parts"), 0, ""
+            if parts is not None and len(parts) > seen:
+                pending += "".join(parts[seen:])
+                seen = len(parts)
+                if end := complete_blocks_length(pending):
+                    live.console.print(Markdown(pending[:end]))
+                    if sink: sink.write(pending[:end]); sink.flush()
+                    pending, shown = pending[end:], True
+                live.update(Markdown(pending) if pending.strip() else spinner)
+            if done: break
+            await asyncio.wait([task], timeout=0.1)
+    result = task.result()
+    if result.get("error"): return result
+    if not shown and not pending:
+        pending = result["response"]  # Nothing was streamed (cache hit or non-streaming call).
+    if pending:
+        console.print(Markdown(pending))
+        if sink: sink.write(pending)
+    if sink: sink.write("\n\n"); sink.flush()
+    return result
+
+def display_turn_telemetry(turn_cost: float, total_cost: float, turn: int, cache_stats: dict | None = None, tokens_saved: int = 0, turn_stats: dict | None = None):
     """Prints the cost information for the completed turn."""
-    console.print(f"\n--- Turn {turn} Cost: ${turn_cost:.6f} | Total Session Cost: ${total_cost:.6f} ---", style="yellow")
\ No newline at end of file
+    console.print(f"\n--- Turn {turn} Cost: ${turn_cost:.6f} | Total Session Cost: ${total_cost:.6f} ---", style="yellow")
+    if turn_stats and turn_stats['calls']:
+        slowest = turn_stats.get('slowest')
+        cached_pct = 100 * turn_stats['cached_tokens'] / max(1, turn_stats['prompt_tokens'])
+        slowest_str = f" | Slowest: {slowest['advisor']} {slowest['latency_s']:.1f}s" if slowest else ""
+        console.print(
+            f"--- Calls: {turn_stats['calls']} ({turn_stats['errors']} errors, {turn_stats['retries']} retries) | "
+            f"Tokens: {turn_stats['prompt_tokens']:,} in ({turn_stats['cached_tokens']:,} cached, {cached_pct:.0f}%) / {turn_stats['completion_tokens']:,} out{slowest_str} ---",
+            style="yellow")
+    if tokens_saved:
+        console.print(f"--- Context Budget: ~{tokens_saved:,} prompt tokens trimmed this turn ---", style="yellow")
+    if cache_stats:
+        console.print(f"--- Response Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses | Saved: ${cache_stats['saved_cost']:.6f} ---", style="yellow")
\ No newline at end of file
@@ -1,11 +1,17 @@
 # ai_council/utils.py
-import os, re, json, logging
+from __future__ import annotations
+import re, time, asyncio, logging, importlib, threading
 
 try:
     import tomllib
 except ModuleNotFoundError:  # pragma: no cover - built-in always present on 3.11+
     import tomli as tomllib
-from openai import AsyncOpenAI
+from typing import TYPE_CHECKING
+from . import blobs
+from .audit import AuditWriter
+
+if TYPE_CHECKING:  # The SDK is heavy to import; it is loaded when the client is built.
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger("ai_council")
 if not logger.handlers:
@@ -23,30 +29,87 @@ def load_config(file_path: str):
         logger.error("Configuration file not found at %s", file_path, exc_info=True)
         raise FileNotFoundError(f"FATAL: Configuration file not found at {file_path}.")
 
-async def generate_filename_slug(prompt: str, client: AsyncOpenAI, council_models: dict, system_prompt: str) -> str:
+def preload(*modules: str):
+    """Imports modules on a background thread, e.g. the OpenAI SDK while the user is still typing."""
+    def run():
+        for module in modules: importlib.import_module(module)
+    threading.Thread(target=run, name="preload", daemon=True).start()
+
+async def generate_filename_slug(prompt: str, client: AsyncOpenAI, council_models: dict, system_prompt: str, telemetry=None) -> str:
     logger.info("Generating filename slug from prompt")
     if not council_models: return "untitled_session"
     model_for_slug = list(council_models.values())[0]
 
+    started = time.monotonic()
     try:
-        response = await client.chat.completions.create(
+        raw = await client.chat.completions.with_raw_response.create(
             model=model_for_slug,
             messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}],
             temperature=0.1, max_tokens=20,
         )
+        response = raw.parse()
+        if telemetry:
+            usage = response.usage
+            telemetry.record("slug", model_for_slug, {
+                "cost": float(raw.headers.get("x-openrouter-cost", 0)), "latency": time.monotonic() - started,
+                "usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens} if usage else {},
+            })
         slug = response.choices[0].message.content.strip().lower()
         slug = re.sub(r'\s+', '_', slug)
         slug = re.sub(r'[^a-z0-9_]', '', slug)
         return slug.strip('_')[:50] or "untitled_session"
     except Exception as e:
+        if telemetry: telemetry.record("slug", model_for_slug, {"response": e, "error": True, "latency": time.monotonic() - started})
         logger.warning("Could not generate AI slug: %s. Falling back to default", e, exc_info=True)
         return "untitled_session"
 
-def write_audit_log(turn_number: int, data: dict):
-    """Writes a detailed JSON log for a single turn."""
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    filename = os.path.join(log_dir, f"turn_{turn_number:03d}_log.json")
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    logger.info("Audit log saved to %s", filename)
+QUORUM_POLL_S = 0.25  # How often to look again while some advisors are still waiting for a slot.
+
+async def wait_for_quorum(tasks: list, quorum: int | None = None, deadline_s: float | None = None, on_result=None, started_at=None) -> list:
+    """
+    Collects advisor results until `quorum` of them have succeeded, every task has
+    finished, or `deadline_s` has passed. Unfinished tasks are left running.
+    With `started_at(task)` (the time the task got its request slot, or None while it is
+    still queued), the deadline runs from each task's start instead of from the call, so
+    time spent queued behind a scheduler or fan-out limit does not count against it.
+    """
+    called = time.monotonic()
+    quorum = quorum or len(tasks)
+    results, pending, answered = [], set(tasks), 0
+    while pending and answered < quorum:
+        timeout, queued = None, False
+        if deadline_s:
+            starts = [started_at(task) if started_at else called for task in pending]
+            if queued := any(start is None for start in starts): timeout = QUORUM_POLL_S
+            else: timeout = max(0.0, max(starts) + deadline_s - time.monotonic())
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            if queued: continue
+            break  # Deadline reached.
+        for task in done:
+            result = task.result()
+            if not result.get("error"): answered += 1
+            if on_result: on_result(result)
+            results.append(result)
+    return results
+
+_audit_writer = None
+
+def open_audit_log(session_id: str):
+    """Starts the background audit writer for a session (logs/<session_id>/)."""
+    global _audit_writer
+    close_audit_log()
+    _audit_writer = AuditWriter(session_id, blobs=blobs.store)
+
+def write_audit_log(turn_number: int, data: dict, kind: str = "turn"):
+    """Queues a detailed audit record for a single turn. Large prompts and responses are stored once in the blob store."""
+    if _audit_writer is None: open_audit_log("default")
+    _audit_writer.write({"kind": kind, "turn": turn_number, "timestamp": time.time(), **data})
+
+def close_audit_log():
+    """Flushes and stops the audit writer, if one is running."""
+    global _audit_writer
+    if _audit_writer is not None:
+        _audit_writer.close()
+        logger.info("Audit log saved to %s", _audit_writer.directory)
+        _audit_writer = None
@@ -0,0 +1,212 @@
+# bench/mock_openrouter.py
+"""
+Offline stand-in for the OpenRouter (OpenAI-compatible) chat completions endpoint.
+
+Simulates per-request time-to-first-token (log-normal), streaming at a fixed token
+rate, random 429/5xx errors with Retry-After, usage chunks and x-openrouter-cost
+headers. Prompt-prefix caching is simulated per model: a prefix seen before is reported
+as cached_tokens and billed at a discount. Providers in `marker_providers` only cache up
+to cache_control breakpoints; the rest cache any repeated message prefix automatically.
+Point the client at it with base_url="http://127.0.0.1:<port>/api/v1".
+
+    python -m bench.mock_openrouter --port 8765 --ttft-ms 400 --error-rate 0.05
+"""
+import json
+import math
+import hashlib
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+class MockProfile:
+    """Latency/error/cost behaviour of the mock; per-model overrides go in `models`."""
+
+    def __init__(self, ttft_ms: float = 300, ttft_sigma: float = 0.5, tokens_per_s: float = 150, output_tokens: int = 120,
+                 error_rate: float = 0.0, retry_after_s: float = 0.5, cost_per_1k_tokens: float = 0.0005,
+                 prompt_cache: bool = True, cached_price: float = 0.25, cache_min_tokens: int = 1024,
+                 marker_providers: tuple = ("anthropic", "google"), models: dict | None = None):
+        self.ttft_ms, self.ttft_sigma = ttft_ms, ttft_sigma
+        self.tokens_per_s, self.output_tokens = tokens_per_s, output_tokens
+        self.error_rate, self.retry_after_s = error_rate, retry_after_s
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        # Cached prompt tokens cost `cached_price` times the normal rate.
+        self.prompt_cache, self.cached_price, self.cache_min_tokens = prompt_cache, cached_price, cache_min_tokens
+        self.marker_providers = tuple(marker_providers)
+        self.models = models or {}
+
+    def for_model(self, model: str) -> "MockProfile":
+        if model not in self.models: return self
+        return MockProfile(**{**self._options(), **self.models[model], "models": None})
+
+    def _options(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k != "models"}
+
+    def ttft_s(self) -> float:
+        # Log-normal around the median, so a few requests land in a long tail.
+        return self.ttft_ms / 1000 * math.exp(random.gauss(0, self.ttft_sigma))
+
+def _text_of(message: dict) -> str:
+    content = message.get("content", "")
+    if isinstance(content, list): return "".join(part.get("text", "") for part in content)
+    return str(content)
+
+def _estimate_prompt_tokens(messages: list) -> int:
+    return sum(len(_text_of(m)) // 4 + 4 for m in messages)
+
+def _has_marker(message: dict) -> bool:
+    content = message.get("content")
+    return isinstance(content, list) and any("cache_control" in part for part in content)
+
+class MockOpenRouter:
+    def __init__(self, profile: MockProfile | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or MockProfile()
+        self.host, self.port = host, port
+        self.requests = 0
+        self.prompt_tokens = self.cached_tokens = 0
+        self._prefix_cache = set()
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def start_in_thread(self) -> int:
+        """Runs the server on its own event loop so it does not share the benchmark's loop."""
+        ready = threading.Event()
+        def run():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+        threading.Thread(target=run, name="mock-openrouter", daemon=True).start()
+        ready.wait()
+        return self.port
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:  # Keep-alive: serve requests until the client closes.
+                request_line = await reader.readline()
+                if not request_line: break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    await self._chat_completion(json.loads(body or b"{}"), writer)
+                else:
+                    await self._send(writer, 404, {"error": {"message": f"No mock route for {method} {path}"}})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status: int, payload: dict, extra_headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}", "Content-Type: application/json", f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    def _cached_prefix_tokens(self, model: str, messages: list, profile: MockProfile) -> int:
+        """Tokens in the longest message prefix served from the simulated cache; caches this request's prefixes."""
+        if not profile.prompt_cache: return 0
+        explicit = model.split("/", 1)[0] in profile.marker_providers
+        digest, tokens, cached = hashlib.sha256(model.encode()), 0, 0
+        for message in messages[:-1]:
+            digest.update(json.dumps([message.get("role"), _text_of(message)]).encode())
+            tokens += _estimate_prompt_tokens([message])
+            if explicit and not _has_marker(message): continue
+            if tokens < profile.cache_min_tokens: continue
+            key = digest.hexdigest()
+            if key in self._prefix_cache: cached = tokens
+            else: self._prefix_cache.add(key)
+        return cached
+
+    async def _chat_completion(self, request: dict, writer):
+        self.requests += 1
+        model = request.get("model", "mock/model")
+        profile = self.profile.for_model(model)
+        await asyncio.sleep(profile.ttft_s())
+        if random.random() < profile.error_rate:
+            status = random.choice([429, 502, 503])
+            await self._send(writer, status, {"error": {"message": "Simulated upstream error", "code": status}}, {"Retry-After": profile.retry_after_s})
+            return
+
+        prompt_tokens = _estimate_prompt_tokens(request.get("messages", []))
+        cached_tokens = self._cached_prefix_tokens(model, request.get("messages", []), profile)
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        completion_tokens = profile.output_tokens
+        billed_prompt_tokens = prompt_tokens - cached_tokens * (1 - profile.cached_price)
+        cost = (billed_prompt_tokens + completion_tokens) / 1000 * profile.cost_per_1k_tokens
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens,
+                 "prompt_tokens_details": {"cached_tokens": cached_tokens}, "cost": cost}
+        completion_id, created = f"mock-{self.requests}", int(time.time())
+        words = [f"{model.split('/')[-1]}-token{i} " for i in range(completion_tokens)]
+
+        if not request.get("stream"):
+            await asyncio.sleep(completion_tokens / profile.tokens_per_s)
+            await self._send(writer, 200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)}, "finish_reason": "stop"}],
+                "usage": usage,
+            }, {"x-openrouter-cost": cost})
+            return
+
+        head = ["HTTP/1.1 200 OK", "Content-Type: text/event-stream", "Transfer-Encoding: chunked", f"x-openrouter-cost: {cost}"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+
+        def event(payload) -> bytes:
+            data = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode()
+            return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+        for word in words:
+            writer.write(event({**chunk, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}))
+            await writer.drain()
+            await asyncio.sleep(1 / profile.tokens_per_s)
+        writer.write(event({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            writer.write(event({**chunk, "choices": [], "usage": usage}))
+        writer.write(event("[DONE]") + b"0\r\n\r\n")
+        await writer.drain()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the offline mock OpenRouter endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Median time to first token.")
+    parser.add_argument("--ttft-sigma", type=float, default=0.5, help="Log-normal spread of TTFT.")
+    parser.add_argument("--tokens-per-s", type=float, default=150)
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Disable the simulated prompt-prefix cache.")
+    parser.add_argument("--profile", help="JSON file of per-model overrides, e.g. {\"mistralai/mistral-nemo\": {\"ttft_ms\": 2000}}")
+    return parser.parse_args()
+
+async def serve(args):
+    models = None
+    if args.profile:
+        with open(args.profile, "r", encoding="utf-8") as f: models = json.load(f)
+    profile = MockProfile(args.ttft_ms, args.ttft_sigma, args.tokens_per_s, args.output_tokens, args.error_rate,
+                          prompt_cache=not args.no_prompt_cache, models=models)
+    server = MockOpenRouter(profile, args.host, args.port)
+    await server.start()
+    print(f"Mock OpenRouter listening on {server.base_url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
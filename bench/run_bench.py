@@ -0,0 +1,187 @@
+# bench/run_bench.py
+"""
+End-to-end latency/throughput benchmark for the council orchestration, run against
+the offline mock endpoint so it costs nothing.
+
+Drives full multi-turn sessions through council.run_turn for several council sizes
+and reports turn latency (p50/p95), orchestration overhead (turn wall time minus the
+slowest advisor and the Rapporteur), session-save time, audit flush time, memory
+growth per turn and the share of prompt tokens served from the (simulated) prompt cache.
+It also profiles `import main` (python -X importtime) and fails when startup imports exceed
+--import-budget-ms. Results can be saved as JSON and checked against a baseline:
+
+    python -m bench.run_bench --sizes 4,16,100 --turns 5 --save bench/baseline.json
+    python -m bench.run_bench --check bench/baseline.json --tolerance 0.25
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+from openai import AsyncOpenAI
+from ai_council import council, session, utils
+from ai_council.journal import SessionJournal
+from ai_council.scheduler import Scheduler
+from ai_council.telemetry import Telemetry
+from .mock_openrouter import MockOpenRouter, MockProfile
+
+PROMPTS = {"rapporteur_system_prompt": "You are the Council Facilitator. Synthesize the council's advice."}
+
+@contextlib.contextmanager
+def working_directory(path: str):
+    """Runs the block in `path` (contextlib.chdir needs Python 3.11)."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+async def bench_council(base_url: str, size: int, turns: int, settings: dict, headless: bool, track_memory: bool) -> dict:
+    client = AsyncOpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    scheduler = Scheduler(max_in_flight=max(32, size), per_model=4)
+    state = session.new_session_state()
+    state.update({
+        "selected_models": {f"Advisor {i:03d}": f"mock/advisor-{i:03d}" for i in range(size)},
+        "rapporteur_model_id": "mock/rapporteur", "last_user_input": "Benchmark question",
+    })
+    journal = SessionJournal("bench_journal.jsonl")
+    telemetry = Telemetry(f"bench_{size}")
+    utils.open_audit_log(f"bench_{size}")
+    turn_s, overhead_s, save_s, memory = [], [], [], []
+    if track_memory: tracemalloc.start()
+    prompt = "Explain the trade-offs of a microservice architecture for a small team. " * 20
+    for _ in range(turns):
+        started = time.perf_counter()
+        state = await council.run_turn(client, state, PROMPTS, prompt, settings, scheduler=scheduler, headless=headless, telemetry=telemetry)
+        elapsed = time.perf_counter() - started
+        timings = state.get('last_turn_timings', {})
+        turn_s.append(elapsed)
+        overhead_s.append(elapsed - timings.get('slowest_advisor_s', 0) - timings.get('rapporteur_s', 0))
+        state['session_log'].append({"turn": state['turn_counter'], "user_prompt": state['last_user_input'], "rapporteur_report": state['last_rapporteur_report']})
+        state['turn_counter'] += 1
+        started = time.perf_counter()
+        journal.save(state)
+        save_s.append(time.perf_counter() - started)
+        if track_memory: memory.append(tracemalloc.get_traced_memory()[0])
+        prompt = council.follow_up_prompt(state['last_rapporteur_report'], "Go deeper.")
+    started = time.perf_counter()
+    utils.close_audit_log()
+    audit_flush_s = time.perf_counter() - started
+    await council.drain_stragglers()
+    if track_memory: tracemalloc.stop()
+    await client.close()
+    growth = (memory[-1] - memory[0]) / max(1, len(memory) - 1) if len(memory) > 1 else 0
+    return {
+        "advisors": size, "turns": turns,
+        "turn_p50_s": percentile(turn_s, 0.5), "turn_p95_s": percentile(turn_s, 0.95),
+        "overhead_mean_s": statistics.mean(overhead_s), "overhead_p95_s": percentile(overhead_s, 0.95),
+        "save_p50_ms": percentile(save_s, 0.5) * 1000, "save_p95_ms": percentile(save_s, 0.95) * 1000,
+        "audit_flush_ms": audit_flush_s * 1000,
+        "memory_growth_kb_per_turn": growth / 1024,
+        "journal_kb": os.path.getsize("bench_journal.jsonl") / 1024,
+        "cached_prompt_pct": 100 * telemetry.session["cached_tokens"] / max(1, telemetry.session["prompt_tokens"]),
+    }
+
+def print_table(results: list):
+    columns = [("advisors", "{:>8}"), ("turn_p50_s", "{:>10.3f}"), ("turn_p95_s", "{:>10.3f}"), ("overhead_mean_s", "{:>15.4f}"),
+               ("overhead_p95_s", "{:>14.4f}"), ("save_p95_ms", "{:>11.2f}"), ("audit_flush_ms", "{:>14.2f}"),
+               ("memory_growth_kb_per_turn", "{:>25.1f}"), ("cached_prompt_pct", "{:>17.1f}")]
+    print("  ".join(f"{name:>{len(fmt.format(0)) if 'f' in fmt else 8}}" for name, fmt in columns))
+    for result in results:
+        print("  ".join(fmt.format(result[name]) for name, fmt in columns))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def profile_imports(module: str = "main", runs: int = 3) -> dict:
+    """
+    Cumulative import time of `module` in a fresh interpreter (python -X importtime), best of
+    `runs`, plus the slowest top-level imports of that run. Config caches are warm after the first run.
+    """
+    best = None
+    for _ in range(runs):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stderr
+        timings = []  # (cumulative microseconds, nesting depth, name)
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line: continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            timings.append((int(cumulative), (len(name) - len(name.lstrip())) // 2, name.strip()))
+        total = next(us for us, depth, name in reversed(timings) if name == module)
+        if best is None or total < best[0]: best = (total, timings)
+    total, timings = best
+    top = sorted(((us, name) for us, depth, name in timings if depth == 1), reverse=True)[:5]
+    return {"import_ms": total / 1000, "slowest_imports": {name: us / 1000 for us, name in top}}
+
+# Lower is better for all of these; they are compared against a saved baseline.
+CHECKED_METRICS = ("overhead_p95_s", "save_p95_ms", "memory_growth_kb_per_turn")
+
+def check_regressions(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {entry["advisors"]: entry for entry in json.load(f)["results"]}
+    failures = []
+    for result in results:
+        if (base := baseline.get(result["advisors"])) is None: continue
+        for metric in CHECKED_METRICS:
+            # Small absolute floors keep noise on near-zero metrics from failing the check.
+            floor = {"overhead_p95_s": 0.01, "save_p95_ms": 1.0, "memory_growth_kb_per_turn": 16}[metric]
+            if result[metric] > max(base[metric] * (1 + tolerance), base[metric] + floor):
+                failures.append(f"{result['advisors']} advisors: {metric} {result[metric]:.4f} vs baseline {base[metric]:.4f}")
+    return failures
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark council orchestration against the offline mock endpoint.")
+    parser.add_argument("--sizes", default="4,16,100", help="Comma-separated council sizes.")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-s", type=float, default=400)
+    parser.add_argument("--output-tokens", type=int, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--ui", action="store_true", help="Include the live dashboard (default: headless turns).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc, which slows allocation-heavy code.")
+    parser.add_argument("--save", help="Write results as JSON (e.g. a new baseline).")
+    parser.add_argument("--check", help="Baseline JSON to compare against; exits non-zero on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression for --check.")
+    parser.add_argument("--import-budget-ms", type=float, default=400, help="Fail if importing main.py takes longer than this.")
+    return parser.parse_args()
+
+async def run(args) -> list:
+    server = MockOpenRouter(MockProfile(ttft_ms=args.ttft_ms, tokens_per_s=args.tokens_per_s, output_tokens=args.output_tokens,
+                                        error_rate=args.error_rate, retry_after_s=0.05))
+    server.start_in_thread()
+    settings = {"dispatch": {}, "context": {"default_budget": 24000}}
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        results.append(await bench_council(server.base_url, size, args.turns, settings, not args.ui, not args.no_memory))
+    return results
+
+def main():
+    args = parse_args()
+    startup = profile_imports()
+    with tempfile.TemporaryDirectory() as workdir, working_directory(workdir):
+        utils.logger.setLevel("WARNING")
+        results = asyncio.run(run(args))
+    print_table(results)
+    print(f"\nimport main: {startup['import_ms']:.1f} ms (budget {args.import_budget_ms:.0f} ms); slowest: "
+          + ", ".join(f"{name} {ms:.1f} ms" for name, ms in startup['slowest_imports'].items()))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f: json.dump({"results": results, "startup": startup}, f, indent=2)
+    failures = check_regressions(results, args.check, args.tolerance) if args.check else []
+    if startup['import_ms'] > args.import_budget_ms:
+        failures.append(f"import main took {startup['import_ms']:.1f} ms, over the {args.import_budget_ms:.0f} ms budget")
+    if failures:
+        print("\nRegressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 # main.py
 import os
 import asyncio
+import argparse
 import datetime
 import re  # NEW: Import regular expressions
-from openai import AsyncOpenAI
-from ai_council import council, session, utils, ui
+from ai_council import council, extract, report, session, utils, ui
+from ai_council.cache import ResponseCache
+from ai_council.health import ModelHealth
+from ai_council.scheduler import Scheduler
+from ai_council.telemetry import Telemetry
+from ai_council.retrieval import DocumentIndex
 
 def extract_suggested_question(report: str) -> str | None:
     """Uses regex to find the question within the 'QUESTION' callout block."""
@@ -18,22 +23,94 @@ def extract_suggested_question(report: str) -> str | None:
         return question
     return None
 
-async def main():
-    if not (api_key := os.getenv("OPENROUTER_API_KEY")):
+def make_client(api_key: str, base_url: str):
+    # Imported here rather than at the top: the SDK takes longer to import than the rest of the app.
+    from openai import AsyncOpenAI
+    # SDK-level retries are off because the scheduler owns retry/backoff.
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Consult a council of LLMs.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache even if enabled in models.toml.")
+    parser.add_argument("--batch", metavar="JOBS.jsonl", help="Run a file of prompts headlessly instead of an interactive session.")
+    parser.add_argument("--models", help="Batch mode: comma-separated advisor names from models.toml (default: all).")
+    parser.add_argument("--max-in-flight", type=int, help="Cap on concurrent LLM requests overall (overrides [scheduler]).")
+    parser.add_argument("--per-model", type=int, help="Cap on concurrent LLM requests per model (overrides [scheduler]).")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="Run the multi-session HTTP service instead of an interactive session.")
+    parser.add_argument("--prompts", default="config/prompts.toml", help="Prompts file to use (e.g. to compare Rapporteur prompts in a replay).")
+    parser.add_argument("--replay", metavar="LOG", help="Replay a recorded session from logs/<LOG>/ instead of calling the models.")
+    parser.add_argument("--replay-session", help="Replay mode: which session to replay when the log holds several (batch logs).")
+    parser.add_argument("--live-seats", help="Replay mode: comma-separated advisor names to call live instead of replaying.")
+    parser.add_argument("--live-rapporteur", action="store_true", help="Replay mode: call the Rapporteur live instead of replaying it.")
+    parser.add_argument("--timing", choices=["recorded", "none"], default="recorded", help="Replay mode: replay recorded latencies, or answer instantly.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay mode: divide recorded latencies by this factor.")
+    return parser.parse_args()
+
+async def main(args: argparse.Namespace):
+    live_seats = [name.strip() for name in args.live_seats.split(",")] if args.live_seats else []
+    # A replay with nothing live never calls the API.
+    needs_api = not args.replay or live_seats or args.live_rapporteur
+    if not (api_key := os.getenv("OPENROUTER_API_KEY")) and needs_api:
         raise ValueError("FATAL: OPENROUTER_API_KEY environment variable not set.")
     
-    client = AsyncOpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key)
-
-    prompts_config = utils.load_config("config/prompts.toml")
+    # OPENROUTER_BASE_URL can point at a local stand-in such as bench/mock_openrouter.py.
+    base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+    prompts_config = utils.load_config(args.prompts)
     models_config = utils.load_config("config/models.toml")
     templates_config = utils.load_config("config/templates.toml")
-    
+
+    cache_config = models_config.get("cache", {})
+    cache = ResponseCache.from_config(cache_config) if cache_config.get("enabled") and not args.no_cache else None
+    scheduler = Scheduler.from_config(models_config.get("scheduler", {}), max_in_flight=args.max_in_flight, per_model=args.per_model)
+    health_config = models_config.get("health", {})
+    health = ModelHealth.from_config(health_config) if health_config.get("enabled") else None
+
+    if args.serve:
+        from ai_council import service
+        # The service shares one client across sessions, over a pool sized in [service].
+        client = service.build_client(api_key, base_url, models_config.get("service", {}))
+        host, _, port = args.serve.rpartition(":")
+        try:
+            await service.serve(client, prompts_config, models_config, scheduler, cache, health, host or "127.0.0.1", int(port))
+        finally:
+            if cache: cache.close()
+        return
+
+    if args.replay:
+        from ai_council import replay
+        recording = replay.load_recording(args.replay, args.replay_session)
+        client = make_client(api_key, base_url) if needs_api else None
+        out_dir = await replay.replay_session(recording, prompts_config, models_config, client, live_seats, args.live_rapporteur,
+                                              args.timing, args.speed, scheduler)
+        utils.logger.info("Replay written to %s", out_dir)
+        if cache: cache.close()
+        return
+
+    if args.batch:
+        from ai_council import batch
+        client = make_client(api_key, base_url)
+        available = models_config.get("models", {})
+        models = {name.strip(): available[name.strip()] for name in args.models.split(",")} if args.models else available
+        jobs = batch.load_jobs(args.batch, templates_config)
+        await batch.run_batch(client, jobs, models, models_config.get("rapporteur", {}).get("model"), prompts_config, models_config, scheduler, cache, health)
+        if cache: cache.close()
+        return
+
+    # Load the SDK in the background while the user answers the first prompts.
+    utils.preload("openai")
     state = session.load_or_initialize_session()
+    utils.open_audit_log(state.setdefault('session_id', session.new_session_id()))
+    telemetry = Telemetry(state['session_id'])
+    if port := models_config.get("telemetry", {}).get("prometheus_port"):
+        telemetry.serve_metrics(port)
+    retrieval_config = models_config.get("retrieval", {})
+    doc_index = DocumentIndex.load(session.INDEX_FILE, chunk_words=retrieval_config.get("chunk_words", 300), overlap_words=retrieval_config.get("overlap_words", 50))
 
     if state['turn_counter'] == 1 and not state['selected_models']:
         ui.display_welcome()
         state['selected_models'] = ui.select_models(models_config.get("models", {}))
         state['rapporteur_model_id'] = models_config.get("rapporteur", {}).get("model")
+    client = make_client(api_key, base_url)
 
     while state.get('running', True):
         
@@ -42,7 +119,7 @@ async def main():
             council_prompt = ui.get_initial_prompt(templates_config)
             state['last_user_input'] = council_prompt.split("--- END DOCUMENT CONTEXT ---")[-1].strip()
             
-            slug = await utils.generate_filename_slug(state['last_user_input'], client, state['selected_models'], prompts_config['filename_slug_prompt'])
+            slug = await utils.generate_filename_slug(state['last_user_input'], client, state['selected_models'], prompts_config['filename_slug_prompt'], telemetry)
             date_str = datetime.datetime.now().strftime('%Y%m%d')
             state['output_filename'] = f"{date_str}_{slug}.md"
             print(f"-> Session will be saved to: output/{state['output_filename']}")
@@ -65,21 +142,35 @@ async def main():
                 break
             
             state['last_user_input'] = user_input
-            doc_context = ui.get_document_context()
-            council_prompt = doc_context + f"Previous summary:\n{state['last_rapporteur_report']}\n\nMy new feedback: \"{user_input}\"\nRefine your answer."
+            if documents := await ui.get_document_context():
+                for label, document, cache_path in documents:
+                    # The cache file is named after the content hash, so it doubles as the document's version.
+                    added = doc_index.add_document(label, extract.iter_pages(cache_path), document, os.path.basename(cache_path))
+                    ui.console.print(f"Indexed {added} chunks from {label}." if added else f"{label} is already indexed.", style="green")
+                doc_index.save()
+            # Only the chunks relevant to this question are sent, not the whole document.
+            doc_context = doc_index.context_for(user_input, retrieval_config.get("top_k", 6))
+            council_prompt = council.follow_up_prompt(state['last_rapporteur_report'], user_input, doc_context)
 
         # C. Run the turn
-        state = await council.run_turn(client, state, prompts_config, council_prompt)
+        state = await council.run_turn(client, state, prompts_config, council_prompt, models_config, cache, scheduler, telemetry=telemetry, health=health)
 
         # D. Update and save state
-        turn_cost = state['total_session_cost'] - sum(t.get('total_cost', 0) for t in state['session_log'])
-        ui.display_turn_telemetry(turn_cost, state['total_session_cost'], state['turn_counter'])
-        state['session_log'].append({"turn": state['turn_counter'], "user_prompt": state['last_user_input'], "rapporteur_report": state['last_rapporteur_report'], "total_cost": state['total_session_cost']})
+        turn_stats = telemetry.turn_summary(state['turn_counter'])
+        telemetry.export()
+        if health: health.save()
+        ui.display_turn_telemetry(turn_stats['cost'], state['total_session_cost'], state['turn_counter'], cache.stats() if cache else None, state.get('last_turn_tokens_saved', 0), turn_stats)
+        state['session_log'].append({"turn": state['turn_counter'], "user_prompt": state['last_user_input'], "rapporteur_report": state['last_rapporteur_report'], "total_cost": state['total_session_cost'], "turn_cost": turn_stats['cost'], "context_tokens_saved": state.get('last_turn_tokens_saved', 0)})
+        report.append_turn(session.report_path(state), state)
         state['turn_counter'] += 1
         session.save_session_state(state)
 
     # 4. Clean up
-    session.end_session(state)
+    await council.drain_stragglers()
+    await telemetry.close()
+    extract.shutdown()
+    session.end_session(state, models_config.get("report", {}).get("export", []))
+    if cache: cache.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
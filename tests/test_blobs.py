@@ -0,0 +1,34 @@
+# tests/test_blobs.py
+import os, json, time
+from ai_council.blobs import BlobStore
+
+def age(store: BlobStore, ref: str, seconds: float):
+    path = store._path(ref.split(":", 1)[1])
+    os.utime(path, (time.time() - seconds, time.time() - seconds))
+    return path
+
+def test_sweep_keeps_referenced_and_young_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    kept, young, dropped = store.put("kept"), store.put("young"), store.put("dropped")
+    age(store, kept, 7200); age(store, dropped, 7200)
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(json.dumps({"snapshot": {"text": {"$blob": kept}}}) + "\n")
+    assert store.sweep([str(journal)], min_age_s=3600) == 1
+    assert store.get(kept) == "kept" and store.get(young) == "young"
+    assert not os.path.exists(store._path(dropped.split(":", 1)[1]))
+
+def test_put_refreshes_reused_blob(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    ref = store.put("about to be referenced again")
+    path = age(store, ref, 7200)
+    assert store.put("about to be referenced again") == ref
+    assert store.sweep([], min_age_s=3600) == 0 and os.path.exists(path)
+
+def test_put_rewrites_a_swept_blob(tmp_path):
+    store, other = BlobStore(str(tmp_path / "blobs")), BlobStore(str(tmp_path / "blobs"))
+    ref = store.put("long-lived service text")
+    age(store, ref, 7200)
+    assert other.sweep([], min_age_s=3600) == 1  # e.g. python -m ai_council.blobs while the service runs.
+    assert store.put("long-lived service text") == ref
+    store.sync()
+    assert BlobStore(str(tmp_path / "blobs")).get(ref) == "long-lived service text"
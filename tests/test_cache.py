@@ -0,0 +1,40 @@
+# tests/test_cache.py
+import time
+from ai_council.cache import ResponseCache
+
+def filled(tmp_path, count: int, size: int = 10, **limits) -> ResponseCache:
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), **limits)
+    for i in range(count): cache.put(f"k{i}", "p/m", "x" * size, 0.01)
+    return cache
+
+def keys(cache: ResponseCache) -> set:
+    return {row[0] for row in cache.db.execute("SELECT key FROM responses")}
+
+def test_make_key_is_stable_and_model_specific():
+    messages = [{"role": "user", "content": "Hi"}]
+    assert ResponseCache.make_key("p/m", messages) == ResponseCache.make_key("p/m", [dict(messages[0])])
+    assert ResponseCache.make_key("p/m", messages) != ResponseCache.make_key("p/other", messages)
+
+def test_hits_misses_and_saved_cost(tmp_path):
+    cache = filled(tmp_path, 1)
+    assert cache.get("k0") == {"response": "x" * 10, "cost": 0.01}
+    assert cache.get("missing") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "saved_cost": 0.01}
+
+def test_evicts_least_recently_used_over_max_entries(tmp_path):
+    cache = filled(tmp_path, 3, max_entries=3)
+    for key, used in (("k0", 300), ("k1", 100), ("k2", 200)):
+        cache.db.execute("UPDATE responses SET last_used = last_used - ? WHERE key = ?", (1000 - used, key))
+    cache.put("k3", "p/m", "x", 0.01)
+    assert keys(cache) == {"k0", "k2", "k3"}
+
+def test_evicts_over_max_mb(tmp_path):
+    cache = filled(tmp_path, 4, size=400 * 1024, max_mb=1)
+    assert keys(cache) == {"k2", "k3"}
+
+def test_expires_entries_past_max_age(tmp_path):
+    cache = filled(tmp_path, 2, max_age_days=1)
+    cache.db.execute("UPDATE responses SET created = ? WHERE key = 'k0'", (time.time() - 2 * 86400,))
+    assert cache.get("k0") is None
+    cache.evict()
+    assert keys(cache) == {"k1"}
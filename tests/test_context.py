@@ -0,0 +1,51 @@
+# tests/test_context.py
+from ai_council import context
+
+DOC = "--- DOCUMENT CONTEXT ---\n" + "Spec text. " * 100 + "\n--- END DOCUMENT CONTEXT ---\n\n"
+
+def exchange(turn: int, size: int = 1000) -> list:
+    return [{"role": "user", "content": f"Question {turn} " + "q" * size},
+            {"role": "assistant", "content": f"Answer {turn} " + "a" * size}]
+
+def alternates(messages: list) -> bool:
+    return all(m['role'] == ("user" if i % 2 == 0 else "assistant") for i, m in enumerate(messages))
+
+def test_history_under_budget_is_unchanged():
+    history = exchange(1) + exchange(2)
+    fitted, prompt, saved = context.fit_history(history, "Next?", 10000)
+    assert fitted == history and prompt == "Next?" and saved == 0
+
+def test_repeated_document_is_not_resent():
+    history = [{"role": "user", "content": DOC + "First?"}, {"role": "assistant", "content": "Yes."}]
+    _, prompt, saved = context.fit_history(history, DOC + "Second?", None)
+    assert prompt == context.DOC_REFERENCE + "Second?" and saved > 0
+
+def test_folded_summary_is_merged_into_first_user_message():
+    history = exchange(1) + exchange(2) + exchange(3)
+    fitted, prompt, saved = context.fit_history(history, "Next?", 1300)
+    messages = fitted + [{"role": "user", "content": prompt}]
+    assert alternates(messages) and saved > 0 and len(messages) == 5
+    summary, _, first = messages[0]['content'].partition(context.SUMMARY_END)
+    assert summary.startswith(context.SUMMARY_HEADER) and "Answer 1" in summary and first == history[2]['content']
+    assert context.estimate_tokens(messages) <= 1300
+
+def test_summary_moves_to_prompt_when_every_turn_is_folded():
+    fitted, prompt, _ = context.fit_history(exchange(1), "Next?", 300)
+    assert fitted == [] and prompt.startswith(context.SUMMARY_HEADER) and prompt.endswith(context.SUMMARY_END + "Next?")
+
+def test_summary_rolls_forward_across_turns():
+    history = exchange(1) + exchange(2) + exchange(3)
+    fitted, prompt, _ = context.fit_history(history, "Turn 4", 1300)
+    history = fitted + [{"role": "user", "content": prompt}, {"role": "assistant", "content": "Answer 4"}] + exchange(5)
+    fitted, prompt, _ = context.fit_history(history, "Turn 6", 1300)
+    messages = fitted + [{"role": "user", "content": prompt}]
+    summary, _, first = messages[0]['content'].partition(context.SUMMARY_END)
+    assert alternates(messages) and summary.count(context.SUMMARY_HEADER) == 1
+    assert all(f"Answer {turn}" in summary for turn in (1, 2, 3)) and first == "Turn 4"
+    assert messages[-1]['content'].endswith("Turn 6")
+
+def test_documents_stay_pinned_after_folding():
+    history = [{"role": "user", "content": DOC + "First? " + "q" * 1000}, {"role": "assistant", "content": "a" * 1000}] + exchange(2)
+    fitted, prompt, _ = context.fit_history(history, DOC + "Again?", 1000)
+    messages = fitted + [{"role": "user", "content": prompt}]
+    assert DOC in messages[0]['content'] and context.DOC_REFERENCE in prompt
@@ -0,0 +1,54 @@
+# tests/test_health.py
+import time
+from ai_council.health import ModelHealth
+
+def tracker(tmp_path, **options) -> ModelHealth:
+    return ModelHealth(str(tmp_path / "health.json"), min_samples=3, **options)
+
+def feed(health: ModelHealth, model: str, count: int, **result):
+    for _ in range(count): health.record(model, {"latency": 1.0, **result})
+
+def test_unknown_and_undersampled_models_are_healthy(tmp_path):
+    health = tracker(tmp_path)
+    feed(health, "p/slow", 2, latency=120.0)
+    assert health.problem("p/new") is None and health.problem("p/slow") is None
+
+def test_problem_reports_errors_and_slow_p95(tmp_path):
+    health = tracker(tmp_path, max_p95_s=10.0, max_error_rate=0.5)
+    feed(health, "p/fine", 5)
+    feed(health, "p/slow", 5, latency=30.0)
+    feed(health, "p/failing", 10, error=True)
+    assert health.problem("p/fine") is None
+    assert health.problem("p/slow") == "p95 30.0s"
+    assert health.problem("p/failing").startswith("error rate")
+
+def test_stale_statistics_are_forgiven(tmp_path):
+    health = tracker(tmp_path, retry_after_s=60)
+    feed(health, "p/m", 10, error=True)
+    health.models["p/m"]["updated"] = time.time() - 120
+    assert health.problem("p/m") is None
+
+def test_cache_hits_are_ignored(tmp_path):
+    health = tracker(tmp_path)
+    feed(health, "p/m", 5, error=True, cached=True)
+    assert "p/m" not in health.models
+
+def test_choose_prefers_first_healthy_fallback(tmp_path):
+    health = tracker(tmp_path, max_p95_s=10.0)
+    feed(health, "p/main", 5, latency=30.0)
+    feed(health, "p/backup1", 5, latency=30.0)
+    assert health.choose("p/main", ["p/backup1", "p/backup2"]) == ("p/backup2", "p95 30.0s")
+    assert health.choose("p/backup2", []) == ("p/backup2", None)
+
+def test_choose_keeps_the_seat_unless_skipping_is_enabled(tmp_path):
+    health = tracker(tmp_path, max_p95_s=10.0)
+    feed(health, "p/main", 5, latency=30.0)
+    assert health.choose("p/main", []) == ("p/main", None)
+    health.skip_unhealthy = True
+    assert health.choose("p/main", []) == (None, "p95 30.0s")
+
+def test_statistics_persist(tmp_path):
+    health = tracker(tmp_path, max_p95_s=10.0)
+    feed(health, "p/m", 5, latency=30.0)
+    health.save()
+    assert tracker(tmp_path, max_p95_s=10.0).problem("p/m") == "p95 30.0s"
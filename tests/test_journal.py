@@ -0,0 +1,77 @@
+# tests/test_journal.py
+import json
+import pytest
+from ai_council import journal
+from ai_council.blobs import BlobStore
+from ai_council.journal import SessionJournal
+
+def make_state():
+    return {"session_id": "s1", "turn_counter": 1, "council_histories": {}, "session_log": [], "total_session_cost": 0.0}
+
+def play_turns(j: SessionJournal, state: dict, turns: int) -> dict:
+    for turn in range(1, turns + 1):
+        state['council_histories'].setdefault("m", []).extend([{"role": "user", "content": f"q{turn}"}, {"role": "assistant", "content": f"a{turn}"}])
+        state['session_log'].append({"turn": turn, "rapporteur_report": f"report {turn}"})
+        state['turn_counter'] = turn + 1
+        state['total_session_cost'] += 0.5
+        j.save(state)
+    return state
+
+def test_round_trip_through_deltas(tmp_path):
+    j = SessionJournal(str(tmp_path / "journal.jsonl"))
+    state = play_turns(j, make_state(), 3)
+    with open(j.path) as f: records = [json.loads(line) for line in f]
+    assert "snapshot" in records[0] and all("ops" in record for record in records[1:])
+    assert SessionJournal(j.path).load() == state
+
+def test_torn_trailing_line_is_ignored(tmp_path):
+    j = SessionJournal(str(tmp_path / "journal.jsonl"))
+    state = play_turns(j, make_state(), 2)
+    with open(j.path, "a") as f: f.write('{"ops": [{"op": "set", "path": ["turn_coun')
+    loaded = SessionJournal(j.path).load()
+    assert loaded == state
+    # Loading compacts the journal, so the torn line is gone for good.
+    with open(j.path) as f: assert len(f.readlines()) == 1
+
+def test_deleted_keys_and_replaced_lists_replay(tmp_path):
+    j = SessionJournal(str(tmp_path / "journal.jsonl"))
+    state = play_turns(j, make_state(), 1)
+    state['council_histories']["m"] = [{"role": "user", "content": "folded"}]
+    state.pop('total_session_cost')
+    j.save(state)
+    assert SessionJournal(j.path).load() == state
+
+def test_compaction_after_too_many_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_EVERY", 3)
+    j = SessionJournal(str(tmp_path / "journal.jsonl"))
+    state = play_turns(j, make_state(), 5)
+    with open(j.path) as f: assert len(f.readlines()) < 5
+    assert SessionJournal(j.path).load() == state
+
+def test_large_strings_go_to_the_blob_store(tmp_path):
+    blobs = BlobStore(str(tmp_path / "blobs"), min_chars=100)
+    j = SessionJournal(str(tmp_path / "journal.jsonl"), blobs)
+    state = make_state()
+    state['last_rapporteur_report'] = "x" * 500
+    j.save(state)
+    assert "x" * 500 not in open(j.path).read()
+    assert SessionJournal(j.path, BlobStore(blobs.root, min_chars=100)).load() == state
+
+def test_missing_snapshot_raises(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"ops": []}\n')
+    with pytest.raises(ValueError):
+        SessionJournal(str(path)).load()
+
+def test_legacy_session_file_is_resumed_and_migrated(tmp_path, monkeypatch):
+    from ai_council import session
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt: "y")
+    legacy = {"running": True, "selected_models": {"A": "p/a"}, "rapporteur_model_id": "p/r", "council_histories": {"p/a": []},
+              "session_log": [{"turn": 1, "user_prompt": "q", "rapporteur_report": "r"}], "total_session_cost": 0.5, "turn_counter": 2,
+              "last_rapporteur_report": "r", "output_filename": "council_session.md", "last_user_input": "q"}
+    with open(session.LEGACY_SESSION_FILE, "w") as f: json.dump(legacy, f)
+    state = session.load_or_initialize_session()
+    assert {key: state[key] for key in legacy} == legacy and state['session_id']
+    assert not (tmp_path / session.LEGACY_SESSION_FILE).exists()
+    assert SessionJournal(session.SESSION_FILE).load() == state
@@ -0,0 +1,66 @@
+# tests/test_quorum.py
+import asyncio, time
+from ai_council import council, session, utils
+from ai_council.replay import ReplayClient
+from ai_council.scheduler import Scheduler
+
+def queued_tasks(count: int, seconds: float, started: dict, slots: int = 1) -> list:
+    """Tasks that run `slots` at a time, each answering `seconds` after it gets a slot."""
+    slot = asyncio.Semaphore(slots)
+    async def advisor(name):
+        async with slot:
+            started[name] = time.monotonic()
+            await asyncio.sleep(seconds)
+            return {"advisor": name, "response": "ok"}
+    tasks = [asyncio.create_task(advisor(f"a{i}")) for i in range(count)]
+    for i, task in enumerate(tasks): task.set_name(f"a{i}")
+    return tasks
+
+def test_deadline_from_call_drops_queued_advisors():
+    async def run():
+        tasks = queued_tasks(3, 0.2, {})
+        results = await utils.wait_for_quorum(tasks, deadline_s=0.3)
+        for task in tasks: task.cancel()
+        return results
+    assert len(asyncio.run(run())) == 1
+
+def test_deadline_from_slot_waits_for_queued_advisors():
+    async def run():
+        started = {}
+        tasks = queued_tasks(3, 0.2, started)
+        return await utils.wait_for_quorum(tasks, deadline_s=0.3, started_at=lambda task: started.get(task.get_name()))
+    assert len(asyncio.run(run())) == 3
+
+def test_deadline_still_applies_once_started():
+    async def run():
+        started = {}
+        tasks = queued_tasks(2, 1.0, started, slots=2)
+        results = await utils.wait_for_quorum(tasks, deadline_s=0.2, started_at=lambda task: started.get(task.get_name()))
+        for task in tasks: task.cancel()
+        return results
+    assert asyncio.run(run()) == []
+
+def test_turn_behind_a_busy_scheduler_keeps_every_advisor(monkeypatch):
+    # Regression: with more advisors than scheduler slots, the deadline used to expire
+    # for advisors that were still queued, leaving the Rapporteur without them.
+    monkeypatch.setattr(utils, "write_audit_log", lambda *args, **kwargs: None)
+    seats = {f"Advisor {i}": f"mock/m{i}" for i in range(4)}
+    answer = lambda name: {"advisor": name, "response": f"{name} says hi", "cost": 0.001, "latency": 0.2, "ttft": 0.05}
+    turn = {"responses": [answer(name) for name in seats], "rapporteur": answer("Rapporteur")}
+    client = ReplayClient(seats, "mock/rapporteur")
+    client.load_turn(turn)
+    state = session.new_session_state()
+    state.update({"selected_models": seats, "rapporteur_model_id": "mock/rapporteur", "last_user_input": "Q"})
+    settings = {"dispatch": {"quorum": 4, "deadline_s": 0.35, "stragglers": "cancel"}}
+    prompts = {"rapporteur_system_prompt": "Synthesize."}
+    state = asyncio.run(council.run_turn(client, state, prompts, "Q", settings, scheduler=Scheduler(max_in_flight=1), headless=True))
+    assert state['last_rapporteur_report'] == "Rapporteur says hi"
+    assert all(len(state['council_histories'][model]) == 2 for model in seats.values())
+
+def test_quorum_for_large_councils(caplog):
+    dispatch = {"quorum": 3, "aggregate_above": 24}
+    assert council.quorum_for(dispatch, 10) == 3 and "quorum" not in caplog.text
+    assert council.quorum_for(dispatch, 100) == 3 and "3 of 100 advisors" in caplog.text
+    assert council.quorum_for({"quorum": 0.8, "aggregate_above": 24}, 100) == 80
+    assert council.quorum_for({"quorum": 0.5}, 3) == 2
+    assert council.quorum_for({"quorum": 0}, 10) is None
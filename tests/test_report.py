@@ -0,0 +1,47 @@
+# tests/test_report.py
+import json
+from ai_council import report
+
+def session_state(turns: int) -> dict:
+    log = [{"turn": i, "user_prompt": f"Question {i}\nwith a second line", "rapporteur_report": f"## Answer {i}\n\n- point {i}"} for i in range(1, turns + 1)]
+    return {"session_id": "20260101_000000_abcdef", "session_log": log, "total_session_cost": 0.25 * turns,
+            "turn_counter": turns + 1, "last_user_input": "Draft question"}
+
+def test_append_turns_round_trip(tmp_path):
+    path, state = str(tmp_path / "report.md"), session_state(0)
+    full = session_state(3)
+    for entry in full['session_log']:
+        state['session_log'].append(entry)
+        state['total_session_cost'] += 0.25
+        report.append_turn(path, state)
+    assert list(report.iter_turns(path)) == full['session_log']
+    values = report.read_front_matter(path)
+    assert values["turns"] == "3" and values["status"] == "in progress" and values["total_cost"] == "0.750000"
+
+def test_draft_is_discarded_on_next_commit(tmp_path):
+    path, state = str(tmp_path / "report.md"), session_state(1)
+    report.write_report(path, state['session_log'], state['session_id'], state['total_session_cost'])
+    with report.open_draft(path, state) as draft: draft.write("Half a synthesis that never fin")
+    assert list(report.iter_turns(path)) == state['session_log']
+    state['session_log'].append({"turn": 2, "user_prompt": "Draft question", "rapporteur_report": "Final synthesis."})
+    report.append_turn(path, state)
+    assert [turn['rapporteur_report'] for turn in report.iter_turns(path)] == ["## Answer 1\n\n- point 1", "Final synthesis."]
+
+def test_finalize_rebuilds_stale_report(tmp_path):
+    path, state = str(tmp_path / "report.md"), session_state(2)
+    report.write_report(path, state['session_log'][:1], "another session")
+    report.finalize(path, state)
+    assert report.read_front_matter(path)["status"] == "complete"
+    assert list(report.iter_turns(path)) == state['session_log']
+
+def test_exports(tmp_path):
+    path, state = str(tmp_path / "report.md"), session_state(2)
+    state['session_log'][1]['rapporteur_report'] = "Careful: <script>alert(1)</script>\n\n| a | b |\n|---|---|\n| 1 | 2 |"
+    state['session_log'][1]['user_prompt'] = "<img src=x onerror=alert(1)>"
+    report.write_report(path, state['session_log'], state['session_id'], state['total_session_cost'], status="complete")
+    json_path, html_path = report.export(path, ["json", "html"])
+    with open(json_path, encoding="utf-8") as f: exported = json.load(f)
+    assert exported["session"]["session_id"] == state['session_id'] and exported["turns"] == state['session_log']
+    with open(html_path, encoding="utf-8") as f: page = f.read()
+    assert "<script>" not in page and "&lt;script&gt;" in page and "<img" not in page
+    assert "<table>" in page and "<h2>Answer 1</h2>" in page
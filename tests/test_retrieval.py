@@ -0,0 +1,42 @@
+# tests/test_retrieval.py
+from ai_council.retrieval import DocumentIndex
+
+def make_index(tmp_path, **kwargs):
+    return DocumentIndex(str(tmp_path / "index.json"), chunk_words=kwargs.pop("chunk_words", 5), overlap_words=kwargs.pop("overlap_words", 1), **kwargs)
+
+def test_chunks_overlap_and_cover_the_document(tmp_path):
+    index = make_index(tmp_path)
+    assert index.add_document("a.txt", ["one two three four five", "six seven eight nine"]) == 2
+    assert [chunk["text"] for chunk in index.chunks] == ["one two three four five", "five six seven eight nine"]
+
+def test_search_ranks_matching_chunks_in_document_order(tmp_path):
+    index = make_index(tmp_path, chunk_words=4, overlap_words=0)
+    index.add_document("a.txt", ["apples are red fruit", "the sky is blue", "red red apples again"])
+    assert [chunk["text"] for chunk in index.search("red apples", k=2)] == ["apples are red fruit", "red red apples again"]
+
+def test_unchanged_document_is_not_reindexed(tmp_path):
+    index = make_index(tmp_path)
+    index.add_document("a.txt", ["alpha beta gamma"], "/docs/a.txt", "v1")
+    assert index.add_document("a.txt", ["alpha beta gamma"], "/docs/a.txt", "v1") == 0
+    assert len(index.chunks) == 1
+
+def test_changed_document_replaces_its_chunks(tmp_path):
+    index = make_index(tmp_path)
+    index.add_document("a.txt", ["alpha beta gamma"], "/docs/a.txt", "v1")
+    assert index.add_document("a.txt", ["omega psi"], "/docs/a.txt", "v2") == 1
+    assert [chunk["text"] for chunk in index.chunks] == ["omega psi"]
+    assert "alpha" not in index.doc_freq
+
+def test_same_basename_from_another_directory_is_indexed(tmp_path):
+    index = make_index(tmp_path)
+    index.add_document("a.txt", ["first file"], "/one/a.txt", "v1")
+    assert index.add_document("a.txt", ["second file"], "/two/a.txt", "v1") == 1
+    assert index.sources == {"a.txt"} and len(index.chunks) == 2
+
+def test_save_and_load_round_trip(tmp_path):
+    index = make_index(tmp_path)
+    index.add_document("a.txt", ["alpha beta gamma"], "/docs/a.txt", "v1")
+    index.save()
+    loaded = DocumentIndex.load(index.path)
+    assert loaded.chunks == index.chunks and loaded.documents == {"/docs/a.txt": "v1"} and loaded.sources == {"a.txt"}
+    assert loaded.add_document("a.txt", ["alpha beta gamma"], "/docs/a.txt", "v1") == 0
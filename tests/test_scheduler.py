@@ -0,0 +1,103 @@
+# tests/test_scheduler.py
+import time, asyncio, logging
+import pytest
+from ai_council import council
+from ai_council.scheduler import Scheduler, TokenBucket
+
+class RateLimited(Exception):
+    status_code = 429
+
+class BadRequest(Exception):
+    status_code = 400
+
+def flaky(failures: int, error: Exception, calls: list, seconds: float = 0.0):
+    """An attempt that returns `error` for its first `failures` calls, then answers."""
+    async def attempt(progress):
+        calls.append(progress)
+        await asyncio.sleep(seconds)
+        if len(calls) <= failures: return {"advisor": "a", "response": error, "error": True}
+        return {"advisor": "a", "response": "ok"}
+    return attempt
+
+def test_retryable_errors_are_retried():
+    calls = []
+    scheduler = Scheduler(backoff_base_s=0.001, backoff_max_s=0.01)
+    result = asyncio.run(scheduler.submit("p/m", flaky(2, RateLimited(), calls), {}))
+    assert result["response"] == "ok" and result["retries"] == 2 and len(calls) == 3
+
+def test_retries_stop_at_max_retries():
+    calls = []
+    scheduler = Scheduler(max_retries=1, backoff_base_s=0.001, backoff_max_s=0.01)
+    result = asyncio.run(scheduler.submit("p/m", flaky(5, RateLimited(), calls), {}))
+    assert result.get("error") and result["retries"] == 1 and len(calls) == 2
+
+def test_non_retryable_errors_are_not_retried():
+    calls = []
+    result = asyncio.run(Scheduler().submit("p/m", flaky(1, BadRequest(), calls), {}))
+    assert result.get("error") and result["retries"] == 0 and len(calls) == 1
+
+def concurrency(scheduler: Scheduler, models: list) -> dict:
+    """Runs one short request per entry of `models`; returns the peak number in flight, overall and per model."""
+    peak, running = {}, {}
+    async def run():
+        async def request(model):
+            async def attempt(progress):
+                for key in (model, "all"):
+                    running[key] = running.get(key, 0) + 1
+                    peak[key] = max(peak.get(key, 0), running[key])
+                await asyncio.sleep(0.02)
+                for key in (model, "all"): running[key] -= 1
+                return {"response": "ok"}
+            return await scheduler.submit(model, attempt, {})
+        await asyncio.gather(*(request(model) for model in models))
+    asyncio.run(run())
+    return peak
+
+def test_per_model_limit():
+    peak = concurrency(Scheduler(per_model=2, model_limits={"p/slow": 1}), ["p/fast"] * 6 + ["p/slow"] * 3)
+    assert peak["p/fast"] == 2 and peak["p/slow"] == 1
+
+def test_global_limit():
+    peak = concurrency(Scheduler(max_in_flight=3, per_model=8), ["p/a"] * 4 + ["q/b"] * 4)
+    assert peak["all"] == 3
+
+def hedged_request(monkeypatch, scheduler: Scheduler, primary_s: float) -> tuple:
+    """ask_advisor through `scheduler`, where the first attempt takes `primary_s` and a duplicate answers in 0.1 s."""
+    calls = []
+    async def request(client, model, name, messages, progress, stream):
+        calls.append(progress)
+        if len(calls) == 1:
+            await asyncio.sleep(primary_s)
+        else:
+            await asyncio.sleep(0.05)
+            progress["first_token"], progress["tokens"] = time.monotonic(), 1
+            await asyncio.sleep(0.05)
+        return {"advisor": name, "response": f"attempt {len(calls)}", "cost": 0}
+    monkeypatch.setattr(council, "_request_completion", request)
+    scheduler.record_latency("p/m", 0.1)
+    result = asyncio.run(council.ask_advisor(None, "p/m", "A", [], {}, scheduler=scheduler))
+    return result, calls
+
+def test_hedge_keeps_the_slot_start_for_latency(monkeypatch):
+    scheduler = Scheduler(hedge=True, hedge_min_samples=1)
+    result, calls = hedged_request(monkeypatch, scheduler, 1.0)
+    assert result["hedged"] and len(calls) == 2
+    assert 0.18 < result["latency"] < 0.5 and result["queue_time"] < 0.05
+    assert 0.04 < result["ttft"] < 0.09  # Measured from the duplicate's own start.
+    assert scheduler._latencies["p/m"][-1] > 0.18
+
+def test_hedge_waits_for_the_rate_limit(monkeypatch):
+    scheduler = Scheduler(hedge=True, hedge_min_samples=1, rate_limits={"p/m": 6})  # One token, refilled every 10 s.
+    result, calls = hedged_request(monkeypatch, scheduler, 0.3)
+    assert len(calls) == 1 and not result.get("hedged") and result["response"] == "attempt 1"
+
+def test_from_config_ignores_unknown_keys(caplog):
+    with caplog.at_level(logging.WARNING, logger="ai_council"):
+        scheduler = Scheduler.from_config({"per_model": 3, "max_inflight": 4}, max_retries=7, hedge=None)
+    assert scheduler.per_model == 3 and scheduler.max_retries == 7 and not scheduler.hedge
+    assert "max_inflight" in caplog.text
+
+def test_token_bucket_rejects_non_positive_rates():
+    for rate in (0, -5):
+        with pytest.raises(ValueError):
+            TokenBucket(rate)
@@ -0,0 +1,62 @@
+# tests/test_service.py
+import json, asyncio
+import pytest
+from ai_council import service
+from ai_council.scheduler import Scheduler
+
+async def request(port: int, method: str, path: str, body: bytes = b"") -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+def run_requests(tmp_path, monkeypatch, requests: list, patch=None) -> list:
+    """Starts a service on a free port and returns (status, payload) for each request; "{session}" is a fresh session id."""
+    monkeypatch.chdir(tmp_path)
+    async def run():
+        svc = service.CouncilService(None, {}, {"models": {"A": "p/a"}, "service": {"sessions_dir": "sessions"}}, Scheduler())
+        if patch: patch(svc)
+        port = await svc.start(port=0)
+        try:
+            session_id = svc.create_session()["state"]['session_id']
+            return [await request(port, method, path.format(session=session_id), body) for method, path, body in requests]
+        finally:
+            await svc.close()
+    return asyncio.run(run())
+
+def test_session_ids_must_be_generated_ids(tmp_path, monkeypatch):
+    (tmp_path / "keep.txt").write_text("x")
+    results = run_requests(tmp_path, monkeypatch, [("DELETE", "/sessions/..", b""), ("GET", "/sessions/.", b""), ("GET", "/sessions/{session}", b"")])
+    assert [status for status, _ in results] == [404, 404, 200]
+    assert (tmp_path / "keep.txt").exists()
+
+@pytest.mark.parametrize("path, body", [
+    ("/sessions", b"[1]"),
+    ("/sessions", b"not json"),
+    ("/sessions", b'{"models": 5}'),
+    ("/sessions", b'{"models": ["A", 5]}'),
+    ("/sessions", b'{"models": ["Unknown seat"]}'),
+    ("/sessions/{session}/turns", b'{"prompt": ["a"]}'),
+    ("/sessions/{session}/turns", b'{"prompt": "   "}'),
+])
+def test_invalid_bodies_get_400(tmp_path, monkeypatch, path, body):
+    [(status, payload)] = run_requests(tmp_path, monkeypatch, [("POST", path, body)])
+    assert status == 400 and payload["error"]
+
+def test_valid_session_is_created(tmp_path, monkeypatch):
+    [(status, payload)] = run_requests(tmp_path, monkeypatch, [("POST", "/sessions", b'{"models": ["A"]}')])
+    assert status == 201 and payload["seats"] == {"A": "p/a"}
+
+def test_unexpected_errors_get_500(tmp_path, monkeypatch):
+    def break_turns(svc):
+        def get_session(session_id): raise RuntimeError("boom")
+        svc.get_session = get_session
+    [(status, payload)] = run_requests(tmp_path, monkeypatch, [("POST", "/sessions/{session}/turns", b'{"prompt": "Hi"}')], break_turns)
+    assert status == 500 and payload == {"error": "Internal server error"}
+
+def test_build_client_uses_the_installed_sdk():
+    client = service.build_client("key", "http://127.0.0.1:9/v1", {"max_connections": 7, "request_timeout_s": 30, "connect_timeout_s": 3})
+    assert client.max_retries == 0 and client.timeout.read == 30 and client.timeout.connect == 3
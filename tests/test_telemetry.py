@@ -0,0 +1,16 @@
+# tests/test_telemetry.py
+import asyncio, urllib.request
+from ai_council.telemetry import Telemetry
+
+def test_metrics_are_served_while_the_event_loop_is_blocked(tmp_path):
+    telemetry = Telemetry("s1", log_dir=str(tmp_path))
+    telemetry.record("advisor", "p/m", {"advisor": "A", "response": "ok", "latency": 1.5, "ttft": 0.2, "cost": 0.01}, turn=1)
+    telemetry.serve_metrics(0)
+    port = telemetry._server.server_address[1]
+    async def blocked_on_input():
+        # Stands in for the CLI sitting in a synchronous input() between turns.
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response: return response.read().decode()
+    text = asyncio.run(blocked_on_input())
+    assert 'ai_council_llm_calls_total{model="p/m",call_type="advisor",status="ok"} 1' in text
+    assert 'ai_council_llm_latency_seconds_count{model="p/m",call_type="advisor"} 1' in text
+    asyncio.run(telemetry.close())